@@ -0,0 +1,282 @@
+import random
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+from constants import GRID_SIZE
+from simulation import Action, MOVE_DIRECTIONS, Simulation
+from world.bitboard import GridBoard
+from stats import GameStats
+
+_NONZERO_RUN = re.compile(rb'[^\x00]+')
+
+def _neighbor_shifts(grid_size: int) -> Dict[int, int]:
+    """Bit offset of the neighbor in each direction (bit index is y * grid_size + x)"""
+    return {
+        Action.UP: -grid_size,
+        Action.DOWN: grid_size,
+        Action.LEFT: -1,
+        Action.RIGHT: 1,
+    }
+
+def _shift(mask: int, offset: int) -> int:
+    return mask << offset if offset > 0 else mask >> -offset
+
+class BatchSimulation:
+    """
+    Steps many independent worlds at once.
+
+    Every world is a grid_size x grid_size bitboard segment, and all segments
+    are packed into one int per layer (rocks, items, players, facing), so
+    moves, collection, rock removal and the rock accessibility check run as
+    a handful of shift/mask operations over the whole batch. The border
+    rocks keep shifted bits from leaking between neighboring segments.
+    """
+    def __init__(self, batch_size: int, seed: Optional[int] = None, grid_size: int = GRID_SIZE):
+        self.batch_size = batch_size
+        self.grid_size = grid_size
+        self.rng = random.Random(seed)
+        self._shifts = _neighbor_shifts(grid_size)
+
+        cells = grid_size * grid_size
+        self._segment_bytes = (cells + 7) // 8
+        self._stride = self._segment_bytes * 8
+        self._total_bytes = self._segment_bytes * batch_size
+        self._segment_mask = (1 << cells) - 1
+        self._full_segment = self._segment_mask.to_bytes(self._segment_bytes, 'little')
+        self._empty_segment = bytes(self._segment_bytes)
+        self._interior = self._replicate(GridBoard(grid_size, grid_size).interior_mask)
+
+        self.reset()
+
+    def reset(self) -> None:
+        """Generate a fresh world for every slot using the GameWorld rules"""
+        rocks, items, players = [], [], []
+        self.tiles_moved: List[int] = []
+        self.sticks_collected: List[int] = []
+        self.rocks_spawned: List[int] = []
+        self.empty_cells: List[int] = []
+
+        for _ in range(self.batch_size):
+            sim = Simulation(self.rng.getrandbits(32), grid_size=self.grid_size)
+            board = sim.world.board
+            rocks.append(board.rocks.to_bytes(self._segment_bytes, 'little'))
+            items.append(board.items.to_bytes(self._segment_bytes, 'little'))
+            players.append(board.bit(sim.player.position).to_bytes(self._segment_bytes, 'little'))
+            self.tiles_moved.append(sim.stats.tiles_moved)
+            self.sticks_collected.append(sim.stats.sticks_collected)
+            self.rocks_spawned.append(sim.stats.rocks_spawned)
+            self.empty_cells.append(sim.stats.empty_cells)
+
+        self.rocks = int.from_bytes(b''.join(rocks), 'little')
+        self.items = int.from_bytes(b''.join(items), 'little')
+        self.players = int.from_bytes(b''.join(players), 'little')
+        # One whole-segment mask per direction; every player starts facing up
+        self.facing = {action: 0 for action in self._shifts}
+        self.facing[Action.UP] = self._replicate(self._segment_mask)
+        self._has_sticks = 0
+
+    def _replicate(self, segment: int) -> int:
+        """Repeat a single-world mask into every segment"""
+        return int.from_bytes(segment.to_bytes(self._segment_bytes, 'little') * self.batch_size, 'little')
+
+    def _select(self, actions: Sequence[int], action: int) -> int:
+        """Build a mask covering the whole segment of every world taking the action"""
+        full, empty = self._full_segment, self._empty_segment
+        return int.from_bytes(b''.join([full if a == action else empty for a in actions]), 'little')
+
+    def _segment(self, world: int) -> int:
+        return self._segment_mask << (world * self._stride)
+
+    def _worlds_in(self, mask: int) -> List[int]:
+        """Get the indices of worlds with at least one bit set in the mask"""
+        worlds = []
+        size = self._segment_bytes
+        for run in _NONZERO_RUN.finditer(mask.to_bytes(self._total_bytes, 'little')):
+            first = run.start() // size
+            if worlds and worlds[-1] == first:
+                first += 1
+            worlds.extend(range(first, (run.end() - 1) // size + 1))
+        return worlds
+
+    def _facing_cells(self, worlds_mask: int) -> int:
+        """Get the cell each player in the selected worlds is facing"""
+        players = self.players & worlds_mask
+        cells = 0
+        for action, offset in self._shifts.items():
+            cells |= _shift(players & self.facing[action], offset)
+        return cells
+
+    def step(self, actions: Sequence[int]) -> None:
+        """Apply one action per world, in world order"""
+        if len(actions) != self.batch_size:
+            raise ValueError(f"Expected {self.batch_size} actions, got {len(actions)}")
+
+        self._move(actions)
+
+        collect_mask = self._select(actions, Action.COLLECT)
+        if collect_mask:
+            self._collect(collect_mask)
+
+        remove_mask = self._select(actions, Action.REMOVE_ROCK)
+        if remove_mask:
+            self._remove_rocks(remove_mask)
+
+    def _move(self, actions: Sequence[int]) -> None:
+        blocked = self.rocks | self.items
+        arrived = 0
+        departed = 0
+        selections = {action: self._select(actions, action) for action in self._shifts}
+        moving = 0
+        for selection in selections.values():
+            moving |= selection
+
+        for action, offset in self._shifts.items():
+            selection = selections[action]
+            # Players turn to face the direction even when the move is blocked
+            self.facing[action] = (self.facing[action] & ~moving) | selection
+            if selection:
+                targets = _shift(self.players & selection, offset) & ~blocked
+                arrived |= targets
+                departed |= _shift(targets, -offset)
+
+        if arrived:
+            self.players = (self.players & ~departed) | arrived
+            for world in self._worlds_in(arrived):
+                self.tiles_moved[world] += 1
+
+    def _collect(self, collect_mask: int) -> None:
+        collected = self._facing_cells(collect_mask) & self.items
+        if not collected:
+            return
+
+        self.items &= ~collected
+        worlds = self._worlds_in(collected)
+        for world in worlds:
+            if self.sticks_collected[world] == 0:
+                self._has_sticks |= self._segment(world)
+            self.sticks_collected[world] += 1
+
+        self._spawn_rocks(worlds, collected)
+        self._spawn_sticks(worlds)
+
+    def _remove_rocks(self, remove_mask: int) -> None:
+        removed = self._facing_cells(remove_mask & self._has_sticks) & self.rocks & self._interior
+        if not removed:
+            return
+
+        self.rocks &= ~removed
+        for world in self._worlds_in(removed):
+            self.sticks_collected[world] -= 1
+            if self.sticks_collected[world] == 0:
+                self._has_sticks &= ~self._segment(world)
+            self.rocks_spawned[world] -= 1
+            self.empty_cells[world] += 1
+
+    def _spawn_rocks(self, worlds: List[int], seeds: int) -> None:
+        """
+        Place one rock in each world that keeps every open cell reachable.
+        Every round tests one candidate per pending world with a single
+        batched flood fill seeded at the collected stick's cell. Dead-end
+        cells are tried first since they can never split the map.
+        """
+        stride = self._stride
+        size = self._segment_bytes
+        open_cells = self._interior & ~self.rocks
+        # Mirror spawn_new_rock: skip the collected cell and all items
+        free = open_cells & ~self.items & ~seeds
+
+        neighbors = [_shift(open_cells, offset) for offset in self._shifts.values()]
+        two_or_more = 0
+        for i in range(len(neighbors)):
+            for j in range(i + 1, len(neighbors)):
+                two_or_more |= neighbors[i] & neighbors[j]
+        dead_ends = free & ~two_or_more
+
+        free_bytes = free.to_bytes(self._total_bytes, 'little')
+        dead_end_bytes = dead_ends.to_bytes(self._total_bytes, 'little')
+        untried = {}
+        for world in worlds:
+            segment = slice(world * size, (world + 1) * size)
+            preferred = int.from_bytes(dead_end_bytes[segment], 'little')
+            others = int.from_bytes(free_bytes[segment], 'little') & ~preferred
+            untried[world] = [preferred, others]
+
+        pending = list(worlds)
+        while pending:
+            candidates = 0
+            pending_mask = 0
+            testing = []
+            for world in pending:
+                groups = untried[world]
+                group = groups[0] or groups[1]
+                if not group:
+                    continue
+                candidate = group & -group
+                if groups[0]:
+                    groups[0] ^= candidate
+                else:
+                    groups[1] ^= candidate
+                candidates |= candidate << (world * stride)
+                pending_mask |= self._segment(world)
+                testing.append(world)
+            if not testing:
+                return
+
+            passable = open_cells & ~candidates & pending_mask
+            reached = self._flood_fill(seeds & pending_mask, passable)
+            unreached = set(self._worlds_in(passable & ~reached))
+
+            placed = 0
+            pending = []
+            for world in testing:
+                if world in unreached:
+                    pending.append(world)
+                else:
+                    placed |= self._segment(world)
+                    self.rocks_spawned[world] += 1
+                    self.empty_cells[world] -= 1
+            self.rocks |= candidates & placed
+
+    def _flood_fill(self, seed: int, passable: int) -> int:
+        filled = seed & passable
+        while True:
+            grown = filled
+            for offset in self._shifts.values():
+                grown |= _shift(filled, offset)
+            grown &= passable
+            if grown == filled:
+                return filled
+            filled = grown
+
+    def _spawn_sticks(self, worlds: List[int]) -> None:
+        """Place a new stick on a uniformly random free cell of each world"""
+        size = self._segment_bytes
+        free_bytes = (self._interior & ~self.rocks & ~self.items).to_bytes(self._total_bytes, 'little')
+        sticks = 0
+        for world in worlds:
+            free = int.from_bytes(free_bytes[world * size:(world + 1) * size], 'little')
+            count = bin(free).count('1')
+            if not count:
+                continue
+            for _ in range(self.rng.randrange(count)):
+                free &= free - 1
+            sticks |= (free & -free) << (world * self._stride)
+        self.items |= sticks
+
+    def get_stats(self, world: int) -> GameStats:
+        """Get a GameStats snapshot for one world"""
+        stats = GameStats()
+        stats.tiles_moved = self.tiles_moved[world]
+        stats.sticks_collected = self.sticks_collected[world]
+        stats.rocks_spawned = self.rocks_spawned[world]
+        stats.empty_cells = self.empty_cells[world]
+        return stats
+
+    def get_world(self, world: int) -> Tuple[int, int, Tuple[int, int], List[int]]:
+        """Get (rocks mask, items mask, player position, player direction) for one world"""
+        offset = world * self._stride
+        rocks = (self.rocks >> offset) & self._segment_mask
+        items = (self.items >> offset) & self._segment_mask
+        player_index = ((self.players >> offset) & self._segment_mask).bit_length() - 1
+        direction = next(list(MOVE_DIRECTIONS[action]) for action in self._shifts
+                         if (self.facing[action] >> offset) & 1)
+        return rocks, items, (player_index % self.grid_size, player_index // self.grid_size), direction
@@ -0,0 +1,274 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from entities.player import Player
+from entities.kinds import KIND_ROCK
+from world.bitboard import GridBoard
+from world.connectivity import ConnectivityIndex
+from world.events import Change
+from world.game_world import GameWorld
+from world.path_finder import PathFinder
+from stats import GameStats
+
+DEFAULT_SIZES = [10, 100, 1000]
+DEFAULT_DENSITIES = [0.05, 0.2]
+# Keep calling a benchmark until this much time has been spent on it
+MIN_TIME = 0.2
+MAX_CALLS = 200
+# Larger grid sizes of a benchmark are skipped once a call is expected to take longer than this
+DEFAULT_BUDGET = 10.0
+
+def measure(fn: Callable[[], object], max_calls: int = MAX_CALLS, min_time: float = MIN_TIME) -> Dict[str, float]:
+    """Time repeated calls of fn and summarize the per-call times in seconds"""
+    times = []
+    start = time.perf_counter()
+    while len(times) < max_calls and (not times or time.perf_counter() - start < min_time):
+        call_start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - call_start)
+    times.sort()
+    return {
+        'calls': len(times),
+        'mean_s': sum(times) / len(times),
+        'median_s': times[len(times) // 2],
+        'min_s': times[0],
+        'max_s': times[-1],
+    }
+
+def interior_rocks(size: int, density: float) -> int:
+    return int(density * (size - 2) * (size - 2))
+
+def scatter_world(size: int, density: float, seed: int = 0) -> GameWorld:
+    """
+    A world with rocks scattered at up to the given density and one stick.
+    Rocks are only kept where their 3x3 neighborhood shows they cannot cut
+    any open cell off, so the map stays connected like a generated one
+    while even the largest grids are ready in moments; generation has its
+    own benchmark.
+    """
+    stats = GameStats()
+    world = GameWorld(stats, seed, generate=False, width=size, height=size)
+    rng = random.Random(seed)
+    interior = sorted(PathFinder.valid_positions(size, size))
+    rng.shuffle(interior)
+    board = GridBoard(size, size)
+    for i in range(size):
+        for pos in ((i, 0), (i, size - 1), (0, i), (size - 1, i)):
+            board.set_kind(pos, KIND_ROCK)
+    connectivity = ConnectivityIndex(board, 1, 1, size - 2, size - 2)
+    rock_count = interior_rocks(size, density)
+    placed = 0
+    for pos in interior:
+        if placed == rock_count:
+            break
+        if connectivity.is_locally_safe(pos):
+            board.set_kind(pos, KIND_ROCK)
+            placed += 1
+    stick = next(pos for pos in interior if not board.is_rock(pos))
+    assert PathFinder.is_board_accessible(board)
+    stats.empty_cells = len(interior)
+    stats.set_initial_rocks(placed)
+    world.load_layers(board.rocks, board.bit(stick))
+    return world
+
+def bench_is_map_accessible(size: int, density: float) -> Tuple[Callable[[], object], int]:
+    world = scatter_world(size, density)
+    rocks = world._get_rock_positions()
+    free = list(world.free_cells)
+    rng = random.Random(0)
+    return lambda: PathFinder.is_map_accessible(rocks, rng.choice(free), size, size), MAX_CALLS
+
+def bench_find_all_accessible_positions(size: int, density: float) -> Tuple[Callable[[], object], int]:
+    world = scatter_world(size, density)
+    rocks = world._get_rock_positions()
+    free = list(world.free_cells)
+    rng = random.Random(0)
+    return lambda: PathFinder.find_all_accessible_positions(rocks, rng.choice(free), size, size), MAX_CALLS
+
+def bench_generate_rocks(size: int, density: float) -> Tuple[Callable[[], object], int]:
+    rock_count = interior_rocks(size, density)
+    seeds = iter(range(1 << 30))
+    # Whole-world construction: borders, interior rocks and the first stick
+    return lambda: GameWorld(GameStats(), next(seeds), width=size, height=size, rock_count=rock_count), 20
+
+def _track_spawned_rocks(world: GameWorld) -> List[Tuple[int, int]]:
+    """List that collects the position of every rock the world spawns"""
+    spawned = []
+    world.events.subscribe(
+        lambda event: spawned.append(event.position) if event.change == Change.ROCK_SPAWNED else None,
+        batched=False)
+    return spawned
+
+def bench_spawn_new_rock(size: int, density: float) -> Tuple[Callable[[], object], int]:
+    world = scatter_world(size, density)
+    center = (size // 2, size // 2)
+    spawned = _track_spawned_rocks(world)
+    def spawn():
+        world.spawn_new_rock(center, world.stats)
+        # Take the rock away again, so every call sees the same density
+        while spawned:
+            world.remove_from_grid(spawned.pop())
+    # The first spawn also builds the connectivity index
+    spawn()
+    return spawn, MAX_CALLS
+
+def bench_check_collection(size: int, density: float) -> Tuple[Callable[[], object], int]:
+    world = scatter_world(size, density)
+    spawned = _track_spawned_rocks(world)
+    def collect():
+        # Each collection spawns a rock and the next stick
+        if world.items:
+            world.check_collection(world.items[0].position, world.stats)
+        # Take the rock away again, so every call sees the same density
+        while spawned:
+            world.remove_from_grid(spawned.pop())
+    # The first collection also builds the connectivity index
+    collect()
+    return collect, MAX_CALLS
+
+def bench_try_remove_rock(size: int, density: float) -> Tuple[Callable[[], object], int]:
+    world = scatter_world(size, density)
+    rocks = sorted(pos for pos in world._get_rock_positions() if world.board.is_interior(pos))
+    random.Random(0).shuffle(rocks)
+    def remove():
+        world.stats.sticks_collected = 1
+        world.try_remove_rock(rocks.pop(), world.stats)
+    return remove, min(MAX_CALLS, len(rocks))
+
+def _render_setup(size: int, density: float, redraw: bool = True) -> Callable[[], object]:
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    from constants import WINDOW_WIDTH, WINDOW_HEIGHT
+    from renderer import Renderer
+    pygame.display.init()
+    pygame.font.init()
+    world = scatter_world(size, density)
+    renderer = Renderer(pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT)))
+    player = Player(size // 2, size // 2)
+    def render():
+        if redraw:
+            # Otherwise an unchanged frame draws nothing
+            renderer.invalidate()
+        renderer.render(world, player, world.stats)
+    return render
+
+def bench_render_first_frame(size: int, density: float) -> Tuple[Callable[[], object], int]:
+    return _render_setup(size, density), 1
+
+def bench_render(size: int, density: float) -> Tuple[Callable[[], object], int]:
+    render = _render_setup(size, density)
+    render()
+    return render, MAX_CALLS
+
+def bench_render_unchanged(size: int, density: float) -> Tuple[Callable[[], object], int]:
+    render = _render_setup(size, density, redraw=False)
+    render()
+    return render, MAX_CALLS
+
+# name -> setup(size, density) returning the call to time and its call limit
+BENCHMARKS = {
+    'pathfinder.is_map_accessible': bench_is_map_accessible,
+    'pathfinder.find_all_accessible_positions': bench_find_all_accessible_positions,
+    'game_world.generate_rocks': bench_generate_rocks,
+    'game_world.spawn_new_rock': bench_spawn_new_rock,
+    'game_world.check_collection': bench_check_collection,
+    'game_world.try_remove_rock': bench_try_remove_rock,
+    'renderer.render_first_frame': bench_render_first_frame,
+    'renderer.render': bench_render,
+    'renderer.render_unchanged': bench_render_unchanged,
+}
+
+def run_benchmarks(names: List[str], sizes: List[int], densities: List[float],
+                   budget: float = DEFAULT_BUDGET) -> dict:
+    """
+    Run every benchmark over the grid size and density sweep.
+    A call is assumed to cost at least linear time in the number of cells,
+    so a size whose estimate from the previous size exceeds budget is
+    recorded as skipped rather than run, along with every larger size.
+    """
+    results = []
+    for name in names:
+        previous = {}  # density -> (grid size, mean seconds) of the last run
+        for size in sorted(sizes):
+            for density in densities:
+                result = {'benchmark': name, 'grid_size': size, 'density': density,
+                          'rocks': interior_rocks(size, density)}
+                last = previous.get(density)
+                if last is not None and (last[1] is None or last[1] * (size / last[0]) ** 2 > budget):
+                    result['skipped'] = True
+                    previous[density] = (size, None)
+                    print(f"{name:42} size {size:5} density {density:4.2f}  skipped", file=sys.stderr)
+                else:
+                    fn, max_calls = BENCHMARKS[name](size, density)
+                    if max_calls == 0:
+                        # Nothing to time at this size, e.g. no rocks to remove
+                        result['skipped'] = True
+                        print(f"{name:42} size {size:5} density {density:4.2f}  nothing to time", file=sys.stderr)
+                        results.append(result)
+                        continue
+                    result.update(measure(fn, max_calls))
+                    previous[density] = (size, result['mean_s'])
+                    print(f"{name:42} size {size:5} density {density:4.2f}  "
+                          f"mean {result['mean_s'] * 1000:10.3f} ms  ({result['calls']} calls)", file=sys.stderr)
+                results.append(result)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'budget_s': budget,
+        },
+        'results': results,
+    }
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """List the benchmarks whose mean time grew by more than threshold times"""
+    def key(result):
+        return (result['benchmark'], result['grid_size'], result['density'])
+    previous = {key(result): result for result in baseline['results'] if 'mean_s' in result}
+    regressions = []
+    for result in current['results']:
+        old = previous.get(key(result))
+        if old and 'mean_s' in result and result['mean_s'] > old['mean_s'] * threshold:
+            regressions.append(f"{result['benchmark']} size {result['grid_size']} density {result['density']}: "
+                               f"{old['mean_s'] * 1000:.3f} ms -> {result['mean_s'] * 1000:.3f} ms")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Pick Up Sticks benchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Grid sizes to sweep')
+    parser.add_argument('--densities', type=float, nargs='+', default=DEFAULT_DENSITIES,
+                        help='Interior rock densities to sweep')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        metavar='NAME', help='Benchmarks to run')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET,
+                        help='Expected seconds per call above which larger sizes of a benchmark are skipped')
+    parser.add_argument('--output', metavar='FILE', help='Write the JSON results to FILE instead of stdout')
+    parser.add_argument('--compare', metavar='FILE', help='Baseline JSON results to check for regressions')
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help='Slowdown against the baseline that counts as a regression')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.only, args.sizes, args.densities, args.budget)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(report, json.load(baseline_file), args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
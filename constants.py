@@ -6,12 +6,59 @@ GAME_WINDOW_SIZE = CELL_SIZE * 11  # Main game view size (11x11 with player in c
 WINDOW_WIDTH = GAME_WINDOW_SIZE + STATS_WIDTH  # Add stats width
 WINDOW_HEIGHT = GAME_WINDOW_SIZE  # Keep game height
 WORLD_SIZE = GRID_SIZE * CELL_SIZE
+RENDER_TILE_CELLS = 16  # Cells per side of each cached rock layer tile
+MAX_CACHED_TILES = 64
+SPATIAL_CHUNK_SIZE = 16  # Cells per side of each spatial index chunk
 
 # Movement constants
 MOVEMENT_DELAY = 0.15  # Seconds between movements when key is held
 MOVEMENT_SPEED = 300  # Pixels per second
 ROCK_COUNT = 5
 
+# Pathfinding
+DISTANCE_FIELD_CACHE_SIZE = 32  # Distance fields kept per world
+PATH_MAX_DISTANCE = 48  # Search radius in steps for chunked worlds
+
+# Loop timing
+TICK_RATE = 60  # Fixed simulation ticks per second
+MAX_FPS = 60  # Render cap
+MAX_TICKS_PER_FRAME = 5  # Ticks run before a frame is forced when falling behind
+IDLE_WAIT_TIMEOUT = 1000  # Longest wait for input in ms while nothing on screen changes
+
+# Telemetry
+TELEMETRY_SAMPLES = 600  # Recent samples kept per metric
+TELEMETRY_PRECISION_BITS = 5  # Histogram buckets per power of two, as a power of two
+TELEMETRY_OVERLAY_INTERVAL = 0.5  # Seconds between overlay refreshes
+
+# Sampling profiler
+PROFILER_INTERVAL = 0.005  # Seconds between stack samples during a capture
+PROFILER_WINDOW = 5.0  # Seconds covered by one capture
+PROFILER_SLOWEST_FRAMES = 10  # Frames listed in a capture summary
+
+# Background map generation
+MAP_POOL_SIZE = 2  # Ready worlds kept queued for new games
+MAP_POOL_WORKERS = None  # Worker processes, None for one per CPU
+
+# Solver
+SOLVER_DEPTH = 40  # Most moves searched below the starting layout
+SOLVER_NODE_BUDGET = 200000  # Nodes searched in total, split across root moves
+SOLVER_TABLE_BITS = 18  # Transposition table entries per worker, as a power of two
+SOLVER_WORKERS = None  # Worker processes, None for one per CPU
+
+# Game server
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8765
+SERVER_TICK_RATE = 30  # Ticks per second; inputs are applied in batches once per tick
+SERVER_SEND_BUFFER_LIMIT = 1 << 20  # Unsent bytes after which a client that stopped reading is dropped
+
+# Chunked world mode (huge maps generated around the camera)
+CHUNKED_WORLD = False
+CHUNKED_WORLD_SIZE = 4096  # Cells per side in chunked mode
+CHUNK_SIZE = 32  # Cells per side of each generated chunk
+CHUNK_ROCK_COUNT = 70  # Interior rocks generated per chunk
+CHUNK_LOAD_RADIUS = 1  # Chunks kept loaded around the camera chunk
+CHUNK_EVICT_RADIUS = 3  # Chunks further away are packed into compact storage
+
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -0,0 +1,73 @@
+import random
+from typing import List, Optional, Sequence, Tuple
+from entities.player import Player
+from world.events import ChangeEvent
+from world.game_world import GameWorld
+from constants import GRID_SIZE
+from simulation import Action, MOVE_DIRECTIONS
+from stats import GameStats, apply_change
+
+class CrowdSimulation:
+    """
+    Many agents sharing one headless world.
+    Every step takes one action per agent: collections and rock removals
+    are applied in agent order, then all moves are resolved together by
+    the world's AgentLayer, so agents never end up on the same cell and
+    a step costs time proportional to the number of agents.
+    """
+    def __init__(self, agent_count: int, seed: Optional[int] = None, grid_size: int = GRID_SIZE):
+        self.stats = GameStats(grid_size, grid_size)  # World totals; each agent also has its own
+        self.world = GameWorld(self.stats, seed, width=grid_size, height=grid_size)
+        self.world.events.subscribe(self._count_total, batched=False)
+        self.rng = random.Random(self.world.seed)
+        self.agents: List[Player] = []
+        for _ in range(agent_count):
+            pos = self.world.get_valid_spawn_position()
+            if pos is None:  # Every free cell already has an agent
+                break
+            self.add_agent(Player(*pos))
+        self.steps = 0
+
+    def _count_total(self, event: ChangeEvent) -> None:
+        """Count every agent's game actions in the world totals as well"""
+        if event.stats is not None and event.stats is not self.stats:
+            apply_change(event._replace(stats=self.stats))
+
+    def add_agent(self, agent: Player) -> GameStats:
+        stats = self.world.agents.add(agent)
+        self.agents.append(agent)
+        return stats
+
+    def agent_stats(self, agent: Player) -> GameStats:
+        return self.world.agents.stats[agent]
+
+    def facing_position(self, agent: Player) -> Tuple[int, int]:
+        return (agent.x + agent.direction[0], agent.y + agent.direction[1])
+
+    def random_actions(self) -> List[int]:
+        """One random action per agent, for load and crowd tests"""
+        return [self.rng.randrange(len(Action)) for _ in self.agents]
+
+    def step(self, actions: Sequence[int]) -> int:
+        """
+        Apply one action per agent, in the order of self.agents.
+        Returns the number of agents that moved.
+        """
+        self.steps += 1
+        world = self.world
+        layer = world.agents
+        for agent, action in zip(self.agents, actions):
+            direction = MOVE_DIRECTIONS.get(action)
+            if direction is not None:
+                layer.request_move(agent, direction)
+            elif action == Action.COLLECT:
+                world.check_collection(self.facing_position(agent), layer.stats[agent])
+            elif action == Action.REMOVE_ROCK:
+                world.try_remove_rock(self.facing_position(agent), layer.stats[agent])
+
+        moved = layer.resolve()
+        for agent in moved:
+            agent.snap_to_target()
+            self.stats.move_made()
+        world.events.flush()
+        return len(moved)
@@ -1,11 +1,22 @@
 from abc import ABC, abstractmethod
 from typing import Tuple
+from entities.kinds import KIND_NONE
 
 class BaseEntity(ABC):
+    # Slotted to keep large maps small
+    __slots__ = ('x', 'y')
+
+    kind = KIND_NONE
+    is_blocking = False
+    is_collectible = False
+    # Seconds between scheduled updates, or None for entities without
+    # behavior, which the world never ticks
+    update_interval = None
+
     def __init__(self, x: int, y: int):
         self.x = x
         self.y = y
-        
+
     @property
     def position(self) -> Tuple[int, int]:
         return (self.x, self.y)
@@ -1,10 +1,12 @@
 from entities.items.base_item import BaseItem
+from entities.kinds import KIND_STICK
 from constants import BROWN
 
 class Stick(BaseItem):
-    def __init__(self, x: int, y: int):
-        super().__init__(x, y)
-        self.is_blocking = True 
+    __slots__ = ()
+
+    kind = KIND_STICK
+    is_blocking = True
     
     def get_render_data(self) -> dict:
         return {
@@ -14,4 +16,4 @@ class Stick(BaseItem):
         }
     
     def on_collect(self) -> None:
-        super().on_collect()
\ No newline at end of file
+        super().on_collect()
@@ -0,0 +1,9 @@
+from constants import GRAY, BROWN
+
+# Entity kinds, also the per-cell values of world boards
+KIND_NONE = 0
+KIND_ROCK = 1
+KIND_STICK = 2
+
+# Render color of each kind, indexed by kind
+KIND_COLORS = (None, GRAY, BROWN)
@@ -1,13 +1,15 @@
 from entities.obstacles.base_obstacle import BaseObstacle
+from entities.kinds import KIND_ROCK
 from constants import GRAY
 
 class Rock(BaseObstacle):
-    def __init__(self, x: int, y: int):
-        super().__init__(x, y)
+    __slots__ = ()
+
+    kind = KIND_ROCK
         
     def get_render_data(self) -> dict:
         return {
             'color': GRAY,
             'position': self.position,
             'type': 'rectangle'
-        }
\ No newline at end of file
+        }
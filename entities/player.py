@@ -1,15 +1,20 @@
-import pygame
+from typing import List, Optional, Tuple
 from entities.base_entity import BaseEntity
-from constants import CELL_SIZE, GRID_SIZE, MOVEMENT_SPEED, BLUE, RED
+from constants import CELL_SIZE, MOVEMENT_SPEED, BLUE, RED
 
 class Player(BaseEntity):
+    __slots__ = ('pixel_pos', 'previous_pixel_pos', 'direction', 'is_moving', 'is_running', 'target_pixel_pos',
+                 'walk_target')
+
     def __init__(self, x: int, y: int):
         super().__init__(x, y)
         self.pixel_pos = [x * CELL_SIZE, y * CELL_SIZE]
+        self.previous_pixel_pos = self.pixel_pos.copy()  # Pixel position before the last update
         self.direction = [0, -1]  # Start facing up
         self.is_moving = False
         self.is_running = False
         self.target_pixel_pos = None
+        self.walk_target: Optional[Tuple[int, int]] = None  # Cell being auto-walked to
 
     def try_move(self, direction, game_world) -> bool:
         """Attempt to move in the given direction"""
@@ -19,23 +24,71 @@ class Player(BaseEntity):
         self.direction = direction
         
         # Quick boundary check
-        if not (0 < new_x < GRID_SIZE-1 and 0 < new_y < GRID_SIZE-1):
+        if not (0 < new_x < game_world.width-1 and 0 < new_y < game_world.height-1):
             return False
             
-        # Check if the target cell is blocked
-        entity = game_world.get_entity_at(new_pos)
-        if entity and entity.is_blocking:
+        # Check if the target cell is blocked, by the map or another agent
+        if game_world.is_blocking(new_pos) or new_pos in game_world.agents:
             return False
         
         if not self.is_moving:
-            self.target_pixel_pos = [new_x * CELL_SIZE, new_y * CELL_SIZE]
-            self.is_moving = True
-            self.x, self.y = new_x, new_y
+            self.step_to(new_pos)
             return True
         return False
 
+    def step_to(self, position: Tuple[int, int]) -> None:
+        """Move onto a neighboring cell and start sliding towards it"""
+        self.target_pixel_pos = [position[0] * CELL_SIZE, position[1] * CELL_SIZE]
+        self.is_moving = True
+        self.x, self.y = position
+
+    def walk_to(self, target: Optional[Tuple[int, int]]) -> None:
+        """Start auto-walking to a cell, or stop with None"""
+        self.walk_target = target
+
+    def next_walk_direction(self, game_world) -> Optional[List[int]]:
+        """
+        Get the next step towards the walk target along a shortest path.
+        The path is looked up again every step from the goal's cached
+        distance field, so it follows changes to the map.
+        """
+        if self.walk_target is None:
+            return None
+        path = game_world.find_path(self.position, self.walk_target)
+        if not path:
+            self.walk_target = None
+            return None
+        if len(path) == 1:
+            # Last step: walk onto the target or turn to face it
+            self.walk_target = None
+        return [path[0][0] - self.x, path[0][1] - self.y]
+
+    def snap_to_target(self) -> None:
+        """Finish the current move instantly, skipping the pixel interpolation"""
+        if self.is_moving and self.target_pixel_pos:
+            self.pixel_pos = self.target_pixel_pos.copy()
+            self.previous_pixel_pos = self.pixel_pos.copy()
+        self.is_moving = False
+        self.target_pixel_pos = None
+
+    @property
+    def is_idle(self) -> bool:
+        """Standing still with no move, walk or animation in progress"""
+        return not self.is_moving and self.walk_target is None and self.previous_pixel_pos == self.pixel_pos
+
+    def render_state(self) -> tuple:
+        """Everything besides the camera position that changes how the player is drawn"""
+        return (self.direction[0], self.direction[1], self.is_moving, self.is_running)
+
+    def get_interpolated_pixel_pos(self, alpha: float) -> List[float]:
+        """Blend the pixel position between the last two updates for rendering"""
+        previous = self.previous_pixel_pos
+        return [previous[0] + (self.pixel_pos[0] - previous[0]) * alpha,
+                previous[1] + (self.pixel_pos[1] - previous[1]) * alpha]
+
     def update(self, dt: float) -> None:
         """Update smooth movement between cells"""
+        self.previous_pixel_pos = self.pixel_pos.copy()
         if self.is_moving and self.target_pixel_pos:
             dx = self.target_pixel_pos[0] - self.pixel_pos[0]
             dy = self.target_pixel_pos[1] - self.pixel_pos[1]
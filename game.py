@@ -1,76 +1,229 @@
-import pygame
+import os
+import signal
 import time
-from constants import WINDOW_WIDTH, WINDOW_HEIGHT, MOVEMENT_DELAY, GRID_SIZE
+import pygame
+from constants import (WINDOW_WIDTH, WINDOW_HEIGHT, MOVEMENT_DELAY, CHUNKED_WORLD, MAX_FPS, GRID_SIZE,
+                       IDLE_WAIT_TIMEOUT)
 from entities.player import Player
 from world.game_world import GameWorld
+from world.chunked_world import ChunkedWorld
 from renderer import Renderer
 from stats import GameStats
+from timestep import FixedTimestep
+from simulation import Action, MOVE_DIRECTIONS, DIRECTION_ACTIONS
+from replay import ReplayRecorder
+from snapshot import load_snapshot, save_snapshot
+from map_pool import MapPool
+from telemetry import Telemetry
+from profiler import SamplingProfiler
+
+# Held movement keys in priority order
+MOVE_KEYS = (
+    (pygame.K_w, Action.UP),
+    (pygame.K_s, Action.DOWN),
+    (pygame.K_a, Action.LEFT),
+    (pygame.K_d, Action.RIGHT),
+)
+
+# World calls that change the map, timed when telemetry is on
+WORLD_MUTATIONS = ('spawn_new_rock', 'spawn_new_stick', 'check_collection', 'try_remove_rock')
 
 class Game:
-    def __init__(self):
-        pygame.init()
+    def __init__(self, seed=None, record_path=None, snapshot_path=None, grid_size=GRID_SIZE,
+                 telemetry_path=None, profile_prefix='profile'):
+        # Only start the subsystems we use; pygame.init() would also open audio
+        pygame.display.init()
+        pygame.font.init()
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption('Pick Up Sticks')
         self.clock = pygame.time.Clock()
         
-        self.player = Player(GRID_SIZE // 2, GRID_SIZE // 2)
-        self.stats = GameStats()
-        self.world = GameWorld(self.stats)
+        # Resume from the snapshot when there is one, else start a new world
+        self.snapshot_path = snapshot_path
+        if snapshot_path and os.path.exists(snapshot_path):
+            self.world, self.player, self.stats = load_snapshot(snapshot_path)
+        else:
+            self.stats = GameStats()
+            if CHUNKED_WORLD:
+                self.world = ChunkedWorld(self.stats, seed=seed)
+            else:
+                self.world = GameWorld(self.stats, seed, width=grid_size, height=grid_size)
+            self.player = Player(self.world.width // 2, self.world.height // 2)
         self.renderer = Renderer(self.screen)
         
         self.running = True
-        self.last_movement_time = time.time()
+        self.timestep = FixedTimestep()
+        self.last_movement_time = self.timestep.time
+        # Worlds for the next new games are built in the background, once
+        # the first new game is asked for
+        self.seed = seed
+        self.map_pool = None
+        chunked = isinstance(self.world, ChunkedWorld)
+        self.recorder = (ReplayRecorder(record_path, self.world.seed, chunked, self.world.width)
+                         if record_path else None)
 
-    def handle_input(self):
-        current_time = time.time()
-        
-        for event in pygame.event.get():
+        # Timings are only collected while exporting or showing the overlay
+        self.telemetry_path = telemetry_path
+        self.telemetry = Telemetry(enabled=telemetry_path is not None)
+        self.telemetry.instrument(self, ('handle_input', 'update'), 'game')
+        self.telemetry.instrument(self.renderer, ('render',), 'renderer')
+        self.telemetry.instrument(self.world, WORLD_MUTATIONS, 'world')
+
+        # Stack sampling captures, started with P or SIGUSR1 while playing
+        self.profiler = SamplingProfiler(profile_prefix)
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.profiler.start())
+
+    def record(self, action: int) -> None:
+        """Log an applied action for replays"""
+        if self.recorder:
+            self.recorder.record(self.timestep.tick_count, action)
+
+    def new_game(self):
+        """
+        Switch to a fresh world from the map pool. The pool only starts
+        with the first new game, which waits for its world to be built.
+        """
+        if self.map_pool is None:
+            self.map_pool = MapPool(isinstance(self.world, ChunkedWorld), seed=self.seed, grid_size=self.world.width)
+        self.telemetry.release(self.world)
+        self.world, self.player, self.stats = self.map_pool.take()
+        self.telemetry.instrument(self.world, WORLD_MUTATIONS, 'world')
+        if self.recorder:
+            # A replay covers a single world, so recording stops here
+            self.recorder.close()
+            self.recorder = None
+
+    def toggle_telemetry_overlay(self):
+        if self.renderer.telemetry is None:
+            self.telemetry.enable()
+            self.renderer.telemetry = self.telemetry
+        else:
+            self.renderer.telemetry = None
+            # Otherwise the overlay stays on screen until something else changes
+            self.renderer.invalidate()
+            if self.telemetry_path is None:
+                self.telemetry.disable()
+
+    def handle_input(self, events=None):
+        for event in pygame.event.get() if events is None else events:
             if event.type == pygame.QUIT:
                 self.running = False
             elif event.type == pygame.KEYDOWN and not self.player.is_moving:
                 check_pos = (self.player.x + self.player.direction[0],
                                self.player.y + self.player.direction[1])
                 if event.key == pygame.K_SPACE:
+                    self.record(Action.COLLECT)
                     self.world.check_collection(check_pos, self.stats)
                 elif event.key == pygame.K_r:
+                    self.record(Action.REMOVE_ROCK)
                     self.world.try_remove_rock(check_pos, self.stats)
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_n:
+                self.new_game()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_t:
+                self.toggle_telemetry_overlay()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+                self.profiler.start()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_f:
+                nearest = self.world.find_nearest_stick(self.player.position)
+                self.player.walk_to(nearest[0] if nearest else None)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                cell = self.renderer.screen_to_cell(event.pos, self.player)
+                if cell is not None:
+                    self.player.walk_to(cell)
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_LSHIFT:
                     self.player.is_running = True
             if event.type == pygame.KEYUP:
                 if event.key == pygame.K_LSHIFT:
                     self.player.is_running = False
-        
-        # Handle continuous movement
+            if event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                self.renderer.invalidate()
+
+    def handle_movement(self):
+        """Handle continuous movement, paced in simulation time"""
+        current_time = self.timestep.time
         if not self.player.is_moving and current_time - self.last_movement_time >= MOVEMENT_DELAY:
             keys = pygame.key.get_pressed()
             moved = False
-            if keys[pygame.K_w]:
-                moved = self.player.try_move([0, -1], self.world)
-            elif keys[pygame.K_s]:
-                moved = self.player.try_move([0, 1], self.world)
-            elif keys[pygame.K_a]:
-                moved = self.player.try_move([-1, 0], self.world)
-            elif keys[pygame.K_d]:
-                moved = self.player.try_move([1, 0], self.world)
+            for key, action in MOVE_KEYS:
+                if keys[key]:
+                    # Manual movement cancels auto-walk
+                    self.player.walk_to(None)
+                    self.record(action)
+                    moved = self.player.try_move(MOVE_DIRECTIONS[action], self.world)
+                    break
+            else:
+                direction = self.player.next_walk_direction(self.world)
+                if direction is not None:
+                    self.record(DIRECTION_ACTIONS[tuple(direction)])
+                    moved = self.player.try_move(direction, self.world)
             
             if moved:
                 self.stats.move_made()
                 self.last_movement_time = current_time
 
     def update(self):
-        dt = self.clock.get_time() / 1000.0
+        """Run one fixed simulation tick"""
+        dt = self.timestep.tick_dt
+        self.handle_movement()
         self.player.update(dt)
+        self.world.update_focus(self.player.position)
         self.world.update(dt)
 
-    def render(self):
-        self.renderer.render(self.world, self.player, self.stats)
-        self.clock.tick(60)
+    def render(self) -> bool:
+        """Draw the frame; returns False when nothing on screen changed"""
+        return self.renderer.render(self.world, self.player, self.stats, self.timestep.alpha)
+
+    def is_idle(self) -> bool:
+        """Check that nothing will change until the next input event"""
+        if (not self.player.is_idle or len(self.world.scheduler) or self.renderer.telemetry is not None
+                or self.profiler.running):
+            return False
+        keys = pygame.key.get_pressed()
+        return not any(keys[key] for key, _ in MOVE_KEYS)
+
+    def wait_for_input(self) -> list:
+        """Block until an event arrives, or IDLE_WAIT_TIMEOUT ms pass, and return the queued events"""
+        event = pygame.event.wait(IDLE_WAIT_TIMEOUT)
+        # The wait is not simulation time that fell behind
+        self.timestep.resync()
+        events = pygame.event.get()
+        return events if event.type == pygame.NOEVENT else [event] + events
 
     def run(self):
+        telemetry = self.telemetry
+        profiler = self.profiler
+        drawn = True
         while self.running:
-            self.handle_input()
-            self.update()
-            self.render()
+            # Once a frame draws nothing and nothing is in motion, sleep until input
+            events = self.wait_for_input() if not drawn and self.is_idle() else None
+            frame_start = time.perf_counter_ns()
+            profiling = profiler.running
+            if profiling:
+                profiler.begin_frame()
+            self.handle_input(events)
+            ticks = 0
+            for _ in self.timestep.ticks():
+                self.update()
+                ticks += 1
+            drawn = self.render()
+            if profiling:
+                # Frame pacing below is not part of the profiled frame
+                profiler.end_frame()
+            self.clock.tick(MAX_FPS)
+            if telemetry.enabled:
+                telemetry.record_time('game.frame', time.perf_counter_ns() - frame_start)
+                telemetry.record('game.ticks_per_frame', ticks, 'ticks')
         
+        if self.recorder:
+            self.recorder.close()
+        if self.snapshot_path:
+            save_snapshot(self.snapshot_path, self.world, self.player, self.stats)
+        if self.telemetry_path:
+            self.telemetry.export(self.telemetry_path)
+        if profiler.running:
+            profiler.stop()
+        if self.map_pool is not None:
+            self.map_pool.close()
         pygame.quit()
\ No newline at end of file
@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import random
+import time
+from collections import deque
+from typing import List, Optional
+from constants import SERVER_HOST, SERVER_PORT
+from entities.kinds import KIND_ROCK, KIND_STICK
+from server import (FRAME_HEADER, FULL_HEADER, PLAYER_STATE, STATS_STATE, CELL_COUNT, CELL_CHANGE,
+                    FRAME_FULL, FRAME_PLAYER, FRAME_STATS, FRAME_CELLS)
+from simulation import Action
+
+_ACTIONS = list(Action)
+
+class MirrorState:
+    """Client-side copy of a session, kept up to date from server frames"""
+    def __init__(self):
+        self.width = 0
+        self.height = 0
+        self.rocks = 0
+        self.items = 0
+        self.player = None
+        self.stats = None
+        self.inputs_applied = 0
+
+    def apply(self, flags: int, inputs_applied: int, payload: bytes) -> None:
+        self.inputs_applied = inputs_applied
+        offset = 0
+        if flags & FRAME_FULL:
+            self.width, self.height = FULL_HEADER.unpack_from(payload, offset)
+            offset += FULL_HEADER.size
+            layer_bytes = (self.width * self.height + 7) // 8
+            self.rocks = int.from_bytes(payload[offset:offset + layer_bytes], 'little')
+            offset += layer_bytes
+            self.items = int.from_bytes(payload[offset:offset + layer_bytes], 'little')
+            offset += layer_bytes
+        if flags & FRAME_PLAYER:
+            self.player = PLAYER_STATE.unpack_from(payload, offset)
+            offset += PLAYER_STATE.size
+        if flags & FRAME_STATS:
+            self.stats = STATS_STATE.unpack_from(payload, offset)
+            offset += STATS_STATE.size
+        if flags & FRAME_CELLS:
+            (count,) = CELL_COUNT.unpack_from(payload, offset)
+            offset += CELL_COUNT.size
+            for _ in range(count):
+                index, kind = CELL_CHANGE.unpack_from(payload, offset)
+                offset += CELL_CHANGE.size
+                bit = 1 << index
+                self.rocks = self.rocks | bit if kind == KIND_ROCK else self.rocks & ~bit
+                self.items = self.items | bit if kind == KIND_STICK else self.items & ~bit
+
+async def read_frames(reader: asyncio.StreamReader, state: MirrorState, sent: deque,
+                      latencies: List[float], counters: List[int]) -> None:
+    """Apply incoming frames and time every acknowledged input"""
+    while True:
+        try:
+            header = await reader.readexactly(FRAME_HEADER.size)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+        length, _, flags, inputs_applied = FRAME_HEADER.unpack(header)
+        payload = await reader.readexactly(length)
+        counters[0] += 1
+        counters[1] += FRAME_HEADER.size + length
+        state.apply(flags, inputs_applied, payload)
+
+        now = time.perf_counter()
+        while sent and sent[0][0] <= inputs_applied:
+            latencies.append(now - sent.popleft()[1])
+
+async def run_session(host: str, port: int, rate: float, duration: float, rng: random.Random,
+                      latencies: List[float], counters: List[int]) -> MirrorState:
+    """Play one session with random actions at the given rate per second"""
+    reader, writer = await asyncio.open_connection(host, port)
+    state = MirrorState()
+    sent: deque = deque()  # (input number, send time)
+    receiver = asyncio.ensure_future(read_frames(reader, state, sent, latencies, counters))
+
+    inputs = 0
+    interval = 1.0 / rate
+    # Spread sessions over the first interval so they don't all send at once
+    await asyncio.sleep(rng.random() * interval)
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        inputs += 1
+        sent.append((inputs, time.perf_counter()))
+        writer.write(bytes((rng.choice(_ACTIONS),)))
+        await asyncio.sleep(interval)
+
+    # Give the server a moment to acknowledge the last inputs
+    await asyncio.sleep(0.5)
+    writer.close()
+    receiver.cancel()
+    return state
+
+async def run_load(host: str, port: int, sessions: int, rate: float, duration: float,
+                   seed: Optional[int] = None) -> None:
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    counters = [0, 0]  # frames, bytes received
+    start = time.perf_counter()
+    await asyncio.gather(*(run_session(host, port, rate, duration, random.Random(rng.getrandbits(32)),
+                                       latencies, counters)
+                           for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    def percentile(fraction: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000
+    print(f"{sessions} sessions, {len(latencies)} inputs acknowledged in {elapsed:.1f}s")
+    if latencies:
+        print(f"Input latency: p50 {percentile(0.5):.1f} ms, p90 {percentile(0.9):.1f} ms, "
+              f"p99 {percentile(0.99):.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+    print(f"Received {counters[0]} frames, {counters[1]} bytes "
+          f"({counters[1] / max(counters[0], 1):.1f} bytes/frame)")
+
+def main():
+    parser = argparse.ArgumentParser(description='Load generator for the Pick Up Sticks server')
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--sessions', type=int, default=1000, help='Concurrent connections')
+    parser.add_argument('--rate', type=float, default=5.0, help='Inputs per second per session')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to send inputs for')
+    parser.add_argument('--seed', type=int, help='Seed for the random inputs')
+    args = parser.parse_args()
+    asyncio.run(run_load(args.host, args.port, args.sessions, args.rate, args.duration, args.seed))
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,40 @@
-from game import Game
+import argparse
+import os
 
 def main():
-    game = Game()
+    parser = argparse.ArgumentParser(description='Pick Up Sticks')
+    parser.add_argument('--seed', type=int, help='Seed for world generation and spawns')
+    parser.add_argument('--record', metavar='FILE', help='Record inputs to a replay file')
+    parser.add_argument('--replay', metavar='FILE', help='Re-simulate a replay headlessly and print the result')
+    parser.add_argument('--snapshot', metavar='FILE',
+                        help='Resume the world saved in FILE if it exists, and save it there on quit')
+    parser.add_argument('--grid-size', type=int, help='Cells per side of the map (default: GRID_SIZE)')
+    parser.add_argument('--telemetry', metavar='FILE',
+                        help='Time frame phases and world changes and write the stats to FILE on quit')
+    parser.add_argument('--profile', metavar='PREFIX', default='profile',
+                        help='Path prefix of the capture files written after pressing P (default: profile)')
+    parser.add_argument('--serve', action='store_true',
+                        help='Host game sessions for network clients instead of playing')
+    args = parser.parse_args()
+    if args.record and args.snapshot and os.path.exists(args.snapshot):
+        parser.error('--record needs a fresh world; it cannot resume from a snapshot')
+
+    if args.replay:
+        from replay import run_replay
+        run_replay(args.replay)
+        return
+
+    if args.serve:
+        from server import run_server
+        run_server(seed=args.seed, grid_size=args.grid_size)
+        return
+
+    from game import Game
+    from constants import GRID_SIZE
+    game = Game(seed=args.seed, record_path=args.record, snapshot_path=args.snapshot,
+                grid_size=args.grid_size or GRID_SIZE, telemetry_path=args.telemetry,
+                profile_prefix=args.profile)
     game.run()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,82 @@
+import multiprocessing
+import random
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, List, Optional, Tuple
+from constants import (GRID_SIZE, MAP_POOL_SIZE, MAP_POOL_WORKERS, CHUNKED_WORLD_SIZE, CHUNK_SIZE,
+                       CHUNK_LOAD_RADIUS)
+from entities.player import Player
+from simulation import Simulation
+from snapshot import Snapshot, encode_snapshot
+from stats import GameStats
+from world.chunked_world import ChunkedWorld, generate_packed_chunk
+
+def _generate_world(seed: int, grid_size: int) -> bytes:
+    """Worker job: build a plain world and return it as an encoded snapshot"""
+    sim = Simulation(seed, grid_size=grid_size)
+    return encode_snapshot(sim.world, sim.player, sim.stats)
+
+def _spawn_chunk_keys() -> List[Tuple[int, int]]:
+    """Keys of the chunks loaded around the player's starting cell"""
+    center = CHUNKED_WORLD_SIZE // 2 // CHUNK_SIZE
+    radius = range(-CHUNK_LOAD_RADIUS, CHUNK_LOAD_RADIUS + 1)
+    return [(center + dx, center + dy) for dy in radius for dx in radius]
+
+class MapPool:
+    """
+    Keeps a bounded queue of ready-to-play worlds, built in a process pool.
+    Plain worlds are generated whole in a worker and come back as encoded
+    snapshots. Chunked worlds are split by region: every chunk around the
+    spawn point is a separate job, so a new game waits for one chunk's
+    worth of work however large the map is.
+    """
+    def __init__(self, chunked: bool = False, capacity: int = MAP_POOL_SIZE,
+                 workers: Optional[int] = MAP_POOL_WORKERS, seed: Optional[int] = None,
+                 grid_size: int = GRID_SIZE):
+        self.chunked = chunked
+        self.grid_size = grid_size
+        self.capacity = capacity
+        self.rng = random.Random(seed)
+        # Spawned workers never inherit the parent's pygame state
+        self._executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+        self._ready: Deque[Tuple[int, List[Future]]] = deque()
+        for _ in range(capacity):
+            self._submit()
+
+    def _submit(self) -> None:
+        """Queue the generation of one more world"""
+        seed = self.rng.getrandbits(32)
+        if not self.chunked:
+            jobs = [self._executor.submit(_generate_world, seed, self.grid_size)]
+        else:
+            jobs = [self._executor.submit(generate_packed_chunk, seed, key) for key in _spawn_chunk_keys()]
+        self._ready.append((seed, jobs))
+
+    def take(self) -> Tuple[object, Player, GameStats]:
+        """Get the oldest queued world, waiting if it is not finished yet, and queue a replacement"""
+        seed, jobs = self._ready.popleft()
+        self._submit()
+        if not self.chunked:
+            return Snapshot(jobs[0].result()).restore()
+
+        stats = GameStats()
+        world = ChunkedWorld(stats, seed=seed)
+        packed = {}
+        for key, job in zip(_spawn_chunk_keys(), jobs):
+            rock_bytes, item_bytes, rocks = job.result()
+            packed[key] = (rock_bytes, item_bytes)
+            # Count the chunk's rocks as if the world had generated it
+            stats.rocks_spawned += rocks
+            stats.empty_cells -= rocks
+        world.load_packed_chunks(packed)
+        player = Player(world.width // 2, world.height // 2)
+        world.update_focus(player.position)
+        return world, player, stats
+
+    @property
+    def ready_count(self) -> int:
+        """Number of queued worlds that are finished"""
+        return sum(all(job.done() for job in jobs) for _, jobs in self._ready)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
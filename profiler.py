@@ -0,0 +1,182 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from constants import PROFILER_INTERVAL, PROFILER_WINDOW, PROFILER_SLOWEST_FRAMES
+
+# Phase of a sample: the first of these found on its stack, innermost
+# phases first. Matched against the qualified names of the functions
+PHASES = (
+    ('pathfinding', ('PathFinder.', 'PathFinderCache.', 'ConnectivityIndex.', 'DistanceField')),
+    ('world', ('GameWorld.', 'ChunkedWorld.')),
+    ('render', ('Renderer.render',)),
+    ('input', ('Game.handle_input',)),
+    ('update', ('Game.update',)),
+)
+
+Stack = Tuple[object, ...]  # Code objects from the root of the stack to the leaf
+
+def _frame_name(code) -> str:
+    name = getattr(code, 'co_qualname', code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class SamplingProfiler:
+    """
+    Samples the call stack of one thread from a background thread.
+    A capture runs for a fixed window and then writes a collapsed-stack
+    file, one 'root;...;leaf count' line per distinct stack as read by
+    flamegraph.pl and speedscope, and a summary of the slowest frames in
+    the window with where their samples were spent. Only time inside frames
+    is sampled. Nothing runs between captures, and while one runs the
+    sampled thread only marks frame boundaries; stacks are read and files
+    written by the sampler.
+    """
+    def __init__(self, output_prefix: str = 'profile', interval: float = PROFILER_INTERVAL,
+                 window: float = PROFILER_WINDOW, thread_id: Optional[int] = None):
+        self.output_prefix = output_prefix
+        self.interval = interval
+        self.window = window
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.running = False
+        self.last_output: Optional[Tuple[str, str]] = None  # (collapsed stacks, summary) paths
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._deadline = 0.0
+        self._frame: Optional[int] = None  # Index of the frame being run, None between frames
+        self._frame_start = 0
+        self._frames: List[Tuple[int, int]] = []  # (duration ns, frame index)
+        self._samples: Counter = Counter()  # Stack -> samples
+        self._frame_samples: Dict[int, Counter] = {}  # Frame index -> stack -> samples
+
+    def start(self) -> bool:
+        """Start a capture; False if one is already running"""
+        if self.running or (self._thread is not None and self._thread.is_alive()):
+            return False
+        self._stop.clear()
+        self._frame = None
+        self._frames = []
+        self._samples = Counter()
+        self._frame_samples = {}
+        self._deadline = time.perf_counter() + self.window
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        """End the capture early, waiting for its files to be written"""
+        self.running = False
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def begin_frame(self) -> None:
+        self._frame_start = time.perf_counter_ns()
+        self._frame = len(self._frames)
+
+    def end_frame(self) -> None:
+        end = time.perf_counter_ns()
+        self._frames.append((end - self._frame_start, self._frame))
+        self._frame = None
+        if time.perf_counter() >= self._deadline:
+            # The sampler writes the files, so the game doesn't stall on them
+            self.running = False
+            self._stop.set()
+
+    def _run(self) -> None:
+        current_frames = sys._current_frames
+        thread_id = self.thread_id
+        samples = self._samples
+        frame_samples = self._frame_samples
+        while not self._stop.wait(self.interval):
+            index = self._frame
+            if index is None:
+                # Between frames the game only paces or waits for input
+                continue
+            frame = current_frames().get(thread_id)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            stack.reverse()
+            stack = tuple(stack)
+            samples[stack] += 1
+            frame_samples.setdefault(index, Counter())[stack] += 1
+        self.running = False
+        try:
+            self._write()
+        except OSError as error:
+            print(f"Profile capture could not be written: {error}", file=sys.stderr)
+
+    def _write(self) -> None:
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        folded_path = f"{self.output_prefix}-{stamp}.folded"
+        summary_path = f"{self.output_prefix}-{stamp}.txt"
+        names: Dict[object, str] = {}
+
+        def name(code) -> str:
+            text = names.get(code)
+            if text is None:
+                text = names[code] = _frame_name(code)
+            return text
+
+        with open(folded_path, 'w') as folded_file:
+            for stack, count in self._samples.most_common():
+                folded_file.write(';'.join(name(code) for code in stack) + f" {count}\n")
+        with open(summary_path, 'w') as summary_file:
+            summary_file.write(self.summary(name))
+        self.last_output = (folded_path, summary_path)
+        print(f"Profile capture written to {folded_path} and {summary_path}", file=sys.stderr)
+
+    def summary(self, name=_frame_name) -> str:
+        """Readable report of the capture: samples by phase, then the slowest frames"""
+        phases: Dict[object, str] = {}
+
+        def phase_of(stack: Stack) -> str:
+            found = []
+            for code in stack:
+                phase = phases.get(code)
+                if phase is None:
+                    qualname = getattr(code, 'co_qualname', code.co_name)
+                    phase = phases[code] = next((phase_name for phase_name, prefixes in PHASES
+                                                 if qualname.startswith(prefixes)), '')
+                if phase:
+                    found.append(phase)
+            for phase_name, _ in PHASES:
+                if phase_name in found:
+                    return phase_name
+            return 'other'
+
+        def by_phase(samples: Counter) -> str:
+            counts = Counter()
+            for stack, count in samples.items():
+                counts[phase_of(stack)] += count
+            total = sum(counts.values()) or 1
+            return ', '.join(f"{phase} {count * 100 // total}%" for phase, count in counts.most_common())
+
+        total = sum(self._samples.values())
+        frames = sorted(self._frames, reverse=True)
+        lines = [f"Frames: {len(frames)}  samples: {total}  interval: {self.interval * 1000:g} ms"]
+        if frames:
+            durations = sorted(duration for duration, _ in frames)
+            lines.append(f"Frame time: median {durations[len(durations) // 2] / 1e6:.2f} ms, "
+                         f"max {durations[-1] / 1e6:.2f} ms")
+        if total:
+            lines.append(f"Samples by phase: {by_phase(self._samples)}")
+
+        lines.append('')
+        lines.append(f"Slowest {min(len(frames), PROFILER_SLOWEST_FRAMES)} frames:")
+        for duration, index in frames[:PROFILER_SLOWEST_FRAMES]:
+            samples = self._frame_samples.get(index)
+            if not samples:
+                lines.append(f"  frame {index}: {duration / 1e6:.2f} ms, no samples")
+                continue
+            lines.append(f"  frame {index}: {duration / 1e6:.2f} ms, {sum(samples.values())} samples "
+                         f"({by_phase(samples)})")
+            stack, count = samples.most_common(1)[0]
+            lines.append(f"    hottest stack ({count}): {' <- '.join(name(code) for code in reversed(stack[-4:]))}")
+        return '\n'.join(lines) + '\n'
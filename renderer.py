@@ -1,12 +1,120 @@
 import pygame
 from constants import *
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
+from entities.kinds import KIND_COLORS, KIND_ROCK
+
+TILE_PIXELS = RENDER_TILE_CELLS * CELL_SIZE
+VIEW_RECT = pygame.Rect(STATS_WIDTH, 0, GAME_WINDOW_SIZE, GAME_WINDOW_SIZE)
+STATS_RECT = pygame.Rect(0, 0, STATS_WIDTH, WINDOW_HEIGHT)
 
 class Renderer:
     def __init__(self, screen):
         self.screen = screen
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
+        self.overlay_font = pygame.font.Font(None, 18)
+        self.game_surface = pygame.Surface((GAME_WINDOW_SIZE, GAME_WINDOW_SIZE))
+
+        # Static rock layer, pre-rendered in tiles and patched on rock changes
+        self._world = None
+        self._tiles: Dict[Tuple[int, int], pygame.Surface] = {}
+        # Rendered stats lines, re-rendered only when their text changes
+        self._stats_text: Dict[int, Tuple[str, pygame.Surface]] = {}
+        # Telemetry shown over the game view, None to hide the overlay
+        self.telemetry = None
+        # What the game view and stats panel on screen were last drawn from
+        self._view_state = None
+        self._stats_state = None
+
+    def invalidate(self) -> None:
+        """Redraw everything on the next frame, e.g. after the window was covered"""
+        self._view_state = None
+        self._stats_state = None
+
+    def _attach_world(self, game_world) -> None:
+        """Start caching the rock layer of a new world"""
+        if self._world is not None:
+            self._world.events.unsubscribe(self._on_world_changes)
+        self._world = game_world
+        self._tiles.clear()
+        self.invalidate()
+        game_world.events.subscribe(self._on_world_changes)
+
+    def _on_world_changes(self, events) -> None:
+        """Patch the cached tiles containing rocks that were added or removed"""
+        for event in events:
+            if event.kind != KIND_ROCK:
+                continue
+            position = event.position
+            tile = self._tiles.get((position[0] // RENDER_TILE_CELLS, position[1] // RENDER_TILE_CELLS))
+            if tile is not None:
+                self._draw_tile_cell(tile, position)
+
+    def _draw_tile_cell(self, tile: pygame.Surface, position: Tuple[int, int]) -> None:
+        """Redraw a single cell of a rock layer tile"""
+        local_x = (position[0] % RENDER_TILE_CELLS) * CELL_SIZE
+        local_y = (position[1] % RENDER_TILE_CELLS) * CELL_SIZE
+        tile.fill(BLACK, (local_x, local_y, CELL_SIZE, CELL_SIZE))
+        if self._world.is_rock(position):
+            pygame.draw.rect(tile, KIND_COLORS[self._world.get_kind(position)],
+                           (local_x, local_y, CELL_SIZE-CELL_MARGIN, CELL_SIZE-CELL_MARGIN))
+
+    def _get_tile(self, tile_pos: Tuple[int, int]) -> pygame.Surface:
+        """Get a rock layer tile, rendering it on first use"""
+        tile = self._tiles.get(tile_pos)
+        if tile is None:
+            tile = pygame.Surface((TILE_PIXELS, TILE_PIXELS))
+            tile.fill(BLACK)
+            world = self._world
+            start_x = tile_pos[0] * RENDER_TILE_CELLS
+            start_y = tile_pos[1] * RENDER_TILE_CELLS
+            for y in range(start_y, min(start_y + RENDER_TILE_CELLS, world.height)):
+                for x in range(start_x, min(start_x + RENDER_TILE_CELLS, world.width)):
+                    if world.is_rock((x, y)):
+                        self._draw_tile_cell(tile, (x, y))
+            self._tiles[tile_pos] = tile
+        return tile
+
+    def draw_rock_layer(self, camera_offset: Tuple[float, float], surface: pygame.Surface) -> None:
+        """Blit the visible part of the cached rock layer"""
+        world = self._world
+        first_x = max(0, int(camera_offset[0] // TILE_PIXELS))
+        first_y = max(0, int(camera_offset[1] // TILE_PIXELS))
+        last_x = min((world.width - 1) // RENDER_TILE_CELLS,
+                     int((camera_offset[0] + GAME_WINDOW_SIZE - 1) // TILE_PIXELS))
+        last_y = min((world.height - 1) // RENDER_TILE_CELLS,
+                     int((camera_offset[1] + GAME_WINDOW_SIZE - 1) // TILE_PIXELS))
+
+        visible: List[Tuple[int, int]] = []
+        for tile_y in range(first_y, last_y + 1):
+            for tile_x in range(first_x, last_x + 1):
+                visible.append((tile_x, tile_y))
+                surface.blit(self._get_tile((tile_x, tile_y)),
+                             (int(tile_x * TILE_PIXELS - camera_offset[0]),
+                              int(tile_y * TILE_PIXELS - camera_offset[1])))
+
+        # Drop off-screen tiles once the cache grows too big
+        if len(self._tiles) > MAX_CACHED_TILES:
+            self._tiles = {tile_pos: self._tiles[tile_pos] for tile_pos in visible}
+
+    def screen_to_cell(self, screen_pos: Tuple[int, int], player) -> Optional[Tuple[int, int]]:
+        """Convert a window position to the grid cell under it, None outside the game view"""
+        view_x = screen_pos[0] - STATS_WIDTH
+        view_y = screen_pos[1]
+        if not (0 <= view_x < GAME_WINDOW_SIZE and 0 <= view_y < GAME_WINDOW_SIZE):
+            return None
+        camera_x = player.pixel_pos[0] - GAME_WINDOW_SIZE // 2
+        camera_y = player.pixel_pos[1] - GAME_WINDOW_SIZE // 2
+        return (int((camera_x + view_x) // CELL_SIZE), int((camera_y + view_y) // CELL_SIZE))
+
+    def draw_cell(self, x: int, y: int, color: Tuple[int, int, int],
+                  camera_offset: Tuple[float, float], surface: pygame.Surface) -> None:
+        """Draw a plain entity cell straight from its coordinates and kind color"""
+        screen_x = x * CELL_SIZE - camera_offset[0]
+        screen_y = y * CELL_SIZE - camera_offset[1]
+        if 0 <= screen_x < GAME_WINDOW_SIZE and 0 <= screen_y < GAME_WINDOW_SIZE:
+            pygame.draw.rect(surface, color,
+                           (screen_x, screen_y, CELL_SIZE-CELL_MARGIN, CELL_SIZE-CELL_MARGIN))
 
     def draw_entity(self, render_data: dict, camera_offset: Tuple[float, float], surface: pygame.Surface) -> None:
         """Draw an entity based on its render data"""
@@ -40,43 +148,80 @@ class Renderer:
                     pygame.draw.rect(surface, render_data['color'],
                                    (screen_x, screen_y, CELL_SIZE-CELL_MARGIN, CELL_SIZE-CELL_MARGIN))
 
-    def render(self, game_world, player, stats):
-        self.screen.fill(BLACK)
+    def render(self, game_world, player, stats, alpha: float = 1.0) -> bool:
+        """
+        Redraw the game view and stats panel if what they show changed and
+        push just those regions to the display.
+        Returns False when the frame was identical and nothing was drawn.
+        """
+        if game_world is not self._world:
+            self._attach_world(game_world)
+        # Changes made outside a tick, e.g. by input, are still pending
+        game_world.events.flush()
         
-        # Calculate camera offset based on player's pixel position
-        camera_x = player.pixel_pos[0] - GAME_WINDOW_SIZE // 2
-        camera_y = player.pixel_pos[1] - GAME_WINDOW_SIZE // 2
+        # Calculate camera offset based on player's pixel position,
+        # interpolated between the last two simulation ticks
+        pixel_pos = player.get_interpolated_pixel_pos(alpha)
+        camera_x = pixel_pos[0] - GAME_WINDOW_SIZE // 2
+        camera_y = pixel_pos[1] - GAME_WINDOW_SIZE // 2
         camera_offset = (camera_x, camera_y)
+
+        # The telemetry overlay changes every frame and spans both regions
+        overlay = self.telemetry is not None
+        view_state = (game_world.version, camera_offset, player.render_state())
+        stats_state = (stats, stats.version)
+        dirty: List[pygame.Rect] = []
+
+        if overlay or view_state != self._view_state:
+            self._view_state = view_state
+            self.render_view(game_world, player, camera_offset)
+            dirty.append(VIEW_RECT)
+        
+        if overlay or stats_state != self._stats_state:
+            self._stats_state = stats_state
+            self.render_stats(stats, game_world)
+            dirty.append(STATS_RECT)
+
+        if dirty:
+            pygame.display.update(dirty)
+        return bool(dirty)
+
+    def render_view(self, game_world, player, camera_offset: Tuple[float, float]) -> None:
+        """Draw the game view around the camera"""
+        camera_x, camera_y = camera_offset
         
         # Draw game elements with offset for stats bar
-        game_surface = pygame.Surface((GAME_WINDOW_SIZE, GAME_WINDOW_SIZE))
+        game_surface = self.game_surface
         game_surface.fill(BLACK)
         
         # Draw game elements on the game surface
-        for obstacle in game_world.obstacles:
-            self.draw_entity(obstacle.get_render_data(), camera_offset, game_surface)
+        self.draw_rock_layer(camera_offset, game_surface)
         
-        for item in game_world.items:
-            self.draw_entity(item.get_render_data(), camera_offset, game_surface)
+        # Only items inside the camera rectangle are drawn
+        min_x = int(camera_x // CELL_SIZE)
+        min_y = int(camera_y // CELL_SIZE)
+        max_x = int((camera_x + GAME_WINDOW_SIZE - 1) // CELL_SIZE)
+        max_y = int((camera_y + GAME_WINDOW_SIZE - 1) // CELL_SIZE)
+        for item in game_world.get_items_in_rect(min_x, min_y, max_x, max_y):
+            self.draw_cell(item.x, item.y, KIND_COLORS[item.kind], camera_offset, game_surface)
         
         self.draw_entity(player.get_render_data(), camera_offset, game_surface)
         
         # Blit game surface onto main screen with offset for stats bar
-        self.screen.blit(game_surface, (STATS_WIDTH, 0))
-        
-        # Draw stats
-        self.render_stats(stats, game_world)
-        
-        pygame.display.flip()
+        self.screen.blit(game_surface, VIEW_RECT)
+        self._draw_divider()
 
-    def render_stats(self, stats, world):
-        # Draw stats background
-        stats_rect = pygame.Rect(0, 0, STATS_WIDTH, WINDOW_HEIGHT)
-        pygame.draw.rect(self.screen, LIGHT_GRAY, stats_rect)
+    def _draw_divider(self) -> None:
+        """Line between the stats panel and the game view, overlapping both"""
         pygame.draw.line(self.screen, GRAY, 
                         (STATS_WIDTH, 0), 
                         (STATS_WIDTH, WINDOW_HEIGHT), 2)
 
+    def render_stats(self, stats, world):
+        # Draw stats background
+        pygame.draw.rect(self.screen, LIGHT_GRAY, STATS_RECT)
+        self._draw_divider()
+
         # Render stats text - adjusted positions
         x_offset = 10  # Moved left
         y_offset = 20  # Moved up
@@ -90,5 +235,29 @@ class Renderer:
         ]
 
         for i, text in enumerate(stats_texts):
-            text_surface = self.font.render(text, True, BLACK)
-            self.screen.blit(text_surface, (x_offset, y_offset + (i * line_height)))
+            self.screen.blit(self._text_surface(i, text, self.font, BLACK),
+                             (x_offset, y_offset + (i * line_height)))
+
+        if self.telemetry is not None:
+            self.render_telemetry_overlay(self.telemetry)
+
+    def _text_surface(self, key: int, text: str, font: pygame.font.Font, color: Tuple[int, int, int]) -> pygame.Surface:
+        """Render a line of text, reusing the last surface drawn for key while its text is unchanged"""
+        cached = self._stats_text.get(key)
+        if cached is None or cached[0] != text:
+            cached = (text, font.render(text, True, color))
+            self._stats_text[key] = cached
+        return cached[1]
+
+    def render_telemetry_overlay(self, telemetry) -> None:
+        """Draw p50/p99/max per metric in the top left corner of the game view"""
+        lines = ["p50 / p99 / max"]
+        for name, summary in telemetry.summary_cached().items():
+            lines.append(f"{name.rsplit('.', 1)[-1]}: {summary['p50']:.2f} / {summary['p99']:.2f} / "
+                         f"{summary['max']:.2f} {summary['unit']}")
+        line_height = 14
+        pygame.draw.rect(self.screen, BLACK, (STATS_WIDTH, 0, GAME_WINDOW_SIZE, len(lines) * line_height + 8))
+        for i, text in enumerate(lines):
+            # Keys after the stats lines
+            self.screen.blit(self._text_surface(100 + i, text, self.overlay_font, WHITE),
+                             (STATS_WIDTH + 6, 4 + i * line_height))
@@ -0,0 +1,107 @@
+import struct
+import time
+from typing import List, Tuple
+from constants import GRID_SIZE
+from simulation import Simulation
+
+REPLAY_MAGIC = b'PUSR'
+REPLAY_VERSION = 2
+FLAG_CHUNKED = 1
+
+# magic, version, flags, world seed, grid size
+_HEADER = struct.Struct('<4sBBQH')
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+class ReplayRecorder:
+    """
+    Writes a compact binary input log.
+    After the header, every input is the tick delta since the previous
+    input as a varint followed by one action byte, so a typical input
+    takes two bytes.
+    """
+    def __init__(self, path: str, seed: int, chunked: bool = False, grid_size: int = GRID_SIZE):
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION,
+                                      FLAG_CHUNKED if chunked else 0, seed, grid_size))
+        self._buffer = bytearray()
+        self._last_tick = 0
+
+    def record(self, tick: int, action: int) -> None:
+        """Log an action applied at the given simulation tick"""
+        _write_varint(self._buffer, tick - self._last_tick)
+        self._buffer.append(action)
+        self._last_tick = tick
+        if len(self._buffer) >= 4096:
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.write(self._buffer)
+        self._buffer.clear()
+        self._file.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+class Replay:
+    """A loaded input log: the world seed and size plus (tick, action) pairs"""
+    def __init__(self, seed: int, chunked: bool, inputs: List[Tuple[int, int]], grid_size: int = GRID_SIZE):
+        self.seed = seed
+        self.chunked = chunked
+        self.inputs = inputs
+        self.grid_size = grid_size
+
+    @classmethod
+    def load(cls, path: str) -> 'Replay':
+        with open(path, 'rb') as replay_file:
+            data = replay_file.read()
+        magic, version, flags, seed, grid_size = _HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay file")
+
+        inputs = []
+        tick = 0
+        offset = _HEADER.size
+        while offset < len(data):
+            delta, offset = _read_varint(data, offset)
+            tick += delta
+            inputs.append((tick, data[offset]))
+            offset += 1
+        return cls(seed, bool(flags & FLAG_CHUNKED), inputs, grid_size)
+
+    def play(self) -> Simulation:
+        """Re-simulate every input headlessly as fast as possible"""
+        sim = Simulation(self.seed, self.chunked, self.grid_size)
+        for _, action in self.inputs:
+            sim.step(action)
+        return sim
+
+def run_replay(path: str) -> None:
+    """Play a replay file and print timing and the final stats"""
+    replay = Replay.load(path)
+    start = time.perf_counter()
+    sim = replay.play()
+    elapsed = time.perf_counter() - start
+
+    last_tick = replay.inputs[-1][0] if replay.inputs else 0
+    print(f"Replayed {len(replay.inputs)} inputs over {last_tick} ticks in {elapsed:.3f}s "
+          f"({len(replay.inputs) / elapsed if elapsed else 0:.0f} inputs/s)")
+    print(f"Moves: {sim.stats.tiles_moved}  Sticks: {sim.stats.sticks_collected}  "
+          f"Rocks: {sim.stats.rocks_spawned}  Empty: {sim.stats.empty_cells}")
+    print(f"Player: {sim.player.position}")
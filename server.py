@@ -0,0 +1,194 @@
+import asyncio
+import struct
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from constants import GRID_SIZE, SERVER_HOST, SERVER_PORT, SERVER_TICK_RATE, SERVER_SEND_BUFFER_LIMIT
+from simulation import Action, Simulation
+from timestep import FixedTimestep
+
+# Frame flags
+FRAME_FULL = 1  # Whole grid layers follow
+FRAME_PLAYER = 2  # Player position and facing changed
+FRAME_STATS = 4  # GameStats counters changed
+FRAME_CELLS = 8  # List of changed cells follows
+
+# Every frame: payload length, tick, flags, inputs applied so far
+FRAME_HEADER = struct.Struct('<IIBI')
+FULL_HEADER = struct.Struct('<HH')  # width, height; rock and item layers follow
+PLAYER_STATE = struct.Struct('<HHbb')  # x, y, facing x, facing y
+# Largest grid side the frames can describe
+MAX_GRID_SIZE = 0xFFFF
+STATS_STATE = struct.Struct('<iiii')  # moves, sticks, rocks, empty cells
+CELL_COUNT = struct.Struct('<I')
+CELL_CHANGE = struct.Struct('<IB')  # cell index (y * width + x), kind
+
+_MAX_ACTION = max(Action)
+
+class Session:
+    """One connected client playing its own world"""
+    def __init__(self, session_id: int, writer: asyncio.StreamWriter, seed: Optional[int] = None,
+                 grid_size: int = GRID_SIZE):
+        self.session_id = session_id
+        self.writer = writer
+        self.sim = Simulation(seed, grid_size=grid_size)
+        self.pending = bytearray()  # Actions received since the last tick
+        self.inputs_applied = 0
+
+        # Cells changed since the last frame, collected from the world's change events
+        self._changed_cells: Set[Tuple[int, int]] = set()
+        self.sim.world.events.subscribe(self._on_world_changes)
+        self._player = self._player_state()
+        self._stats = self._stats_state()
+
+    def _on_world_changes(self, events) -> None:
+        self._changed_cells.update(event.position for event in events)
+
+    def _player_state(self) -> tuple:
+        player = self.sim.player
+        return (player.x, player.y, player.direction[0], player.direction[1])
+
+    def _stats_state(self) -> tuple:
+        stats = self.sim.stats
+        return (stats.tiles_moved, stats.sticks_collected, stats.rocks_spawned, stats.empty_cells)
+
+    def full_frame(self, tick: int) -> bytes:
+        """Encode the complete state, sent once when the client connects"""
+        board = self.sim.world.board
+        layer_bytes = (board.size + 7) // 8
+        payload = (FULL_HEADER.pack(board.width, board.height)
+                   + board.rocks.to_bytes(layer_bytes, 'little')
+                   + board.items.to_bytes(layer_bytes, 'little')
+                   + PLAYER_STATE.pack(*self._player)
+                   + STATS_STATE.pack(*self._stats))
+        return FRAME_HEADER.pack(len(payload), tick, FRAME_FULL | FRAME_PLAYER | FRAME_STATS,
+                                 self.inputs_applied) + payload
+
+    def apply_pending(self) -> None:
+        """Apply every action received since the last tick, in order"""
+        step = self.sim.step
+        for action in self.pending:
+            if action <= _MAX_ACTION:
+                step(action)
+        self.inputs_applied += len(self.pending)
+        self.pending.clear()
+
+    def delta_frame(self, tick: int) -> bytes:
+        """Encode only what changed since the last frame"""
+        flags = 0
+        payload = bytearray()
+
+        player = self._player_state()
+        if player != self._player:
+            flags |= FRAME_PLAYER
+            payload += PLAYER_STATE.pack(*player)
+            self._player = player
+
+        stats = self._stats_state()
+        if stats != self._stats:
+            flags |= FRAME_STATS
+            payload += STATS_STATE.pack(*stats)
+            self._stats = stats
+
+        world = self.sim.world
+        world.events.flush()
+        if self._changed_cells:
+            flags |= FRAME_CELLS
+            width = world.width
+            cells = bytearray()
+            for x, y in sorted(self._changed_cells, key=lambda pos: (pos[1], pos[0])):
+                cells += CELL_CHANGE.pack(y * width + x, world.get_kind((x, y)))
+            payload += CELL_COUNT.pack(len(self._changed_cells))
+            payload += cells
+            self._changed_cells.clear()
+
+        return FRAME_HEADER.pack(len(payload), tick, flags, self.inputs_applied) + payload
+
+class GameServer:
+    """
+    Hosts many game sessions in one process.
+    Clients send single action bytes at any time; they are queued per
+    session and applied together once per tick, after which each session
+    that received input gets one delta frame with whatever changed.
+    Ticks never wait on a client: one that lets more than
+    SERVER_SEND_BUFFER_LIMIT bytes pile up unsent is disconnected.
+    """
+    def __init__(self, host: str = SERVER_HOST, port: int = SERVER_PORT,
+                 tick_rate: int = SERVER_TICK_RATE, seed: Optional[int] = None, grid_size: int = GRID_SIZE):
+        if not 3 <= grid_size <= MAX_GRID_SIZE:
+            raise ValueError(f"Grid size must be between 3 and {MAX_GRID_SIZE}, got {grid_size}")
+        self.host = host
+        self.port = port
+        self.grid_size = grid_size
+        self.timestep = FixedTimestep(tick_rate)
+        self.seed = seed
+        self.sessions: Dict[int, Session] = {}
+        self._next_id = 0
+
+        # Per-tick processing times in seconds, drained by report()
+        self.tick_times: List[float] = []
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session_seed = None if self.seed is None else self.seed + self._next_id
+        session = Session(self._next_id, writer, session_seed, self.grid_size)
+        self._next_id += 1
+        self.sessions[session.session_id] = session
+        writer.write(session.full_frame(self.timestep.tick_count))
+        try:
+            await writer.drain()
+            while True:
+                data = await reader.read(4096)
+                if not data:
+                    break
+                session.pending += data
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions.pop(session.session_id, None)
+            writer.close()
+
+    def tick(self) -> None:
+        """Apply the queued inputs of every session and send the deltas"""
+        start = time.perf_counter()
+        tick = self.timestep.tick_count
+        for session in list(self.sessions.values()):
+            if session.writer.transport.get_write_buffer_size() > SERVER_SEND_BUFFER_LIMIT:
+                # The client stopped reading; drop it instead of queueing frames without bound
+                del self.sessions[session.session_id]
+                session.writer.close()
+                continue
+            if session.pending:
+                session.apply_pending()
+                session.writer.write(session.delta_frame(tick))
+        self.tick_times.append(time.perf_counter() - start)
+
+    def report(self) -> str:
+        """Summarize and reset the tick times collected since the last report"""
+        times = sorted(self.tick_times)
+        self.tick_times.clear()
+        if not times:
+            return f"{len(self.sessions)} sessions, no ticks"
+        p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+        return (f"{len(self.sessions)} sessions, {len(times)} ticks, "
+                f"mean {sum(times) / len(times) * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms, "
+                f"dropped {self.timestep.dropped_ticks}")
+
+    async def serve(self, report_interval: float = 5.0) -> None:
+        server = await asyncio.start_server(self._handle_client, self.host, self.port, backlog=4096)
+        print(f"Serving on {self.host}:{self.port}")
+        next_report = time.perf_counter() + report_interval
+        async with server:
+            while True:
+                for _ in self.timestep.ticks():
+                    self.tick()
+                if time.perf_counter() >= next_report:
+                    print(self.report())
+                    next_report += report_interval
+                # Sleep until the next tick is due
+                await asyncio.sleep(self.timestep.tick_dt * (1.0 - self.timestep.alpha))
+
+def run_server(host: str = SERVER_HOST, port: int = SERVER_PORT, seed: Optional[int] = None,
+               grid_size: Optional[int] = None) -> None:
+    try:
+        asyncio.run(GameServer(host, port, seed=seed, grid_size=grid_size or GRID_SIZE).serve())
+    except KeyboardInterrupt:
+        pass
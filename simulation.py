@@ -0,0 +1,107 @@
+from enum import IntEnum
+from typing import List, Optional, Tuple
+from entities.player import Player
+from world.game_world import GameWorld
+from world.chunked_world import ChunkedWorld
+from constants import GRID_SIZE
+from stats import GameStats
+from snapshot import Snapshot, save_snapshot
+
+class Action(IntEnum):
+    NOOP = 0
+    UP = 1
+    DOWN = 2
+    LEFT = 3
+    RIGHT = 4
+    COLLECT = 5
+    REMOVE_ROCK = 6
+
+MOVE_DIRECTIONS = {
+    Action.UP: [0, -1],
+    Action.DOWN: [0, 1],
+    Action.LEFT: [-1, 0],
+    Action.RIGHT: [1, 0],
+}
+
+DIRECTION_ACTIONS = {tuple(direction): action for action, direction in MOVE_DIRECTIONS.items()}
+
+class Simulation:
+    """
+    Headless game engine: the same rules as Game without pygame.
+    Every step applies one action instantly, with no frame pacing or
+    pixel interpolation, so bots and regression runs go at CPU speed.
+    """
+    def __init__(self, seed: Optional[int] = None, chunked: bool = False, grid_size: int = GRID_SIZE):
+        self.chunked = chunked
+        self.grid_size = grid_size  # Plain worlds only; chunked worlds use CHUNKED_WORLD_SIZE
+        self.reset(seed)
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """Start a fresh world, reproducible when a seed is given"""
+        self.stats = GameStats()
+        if self.chunked:
+            self.world = ChunkedWorld(self.stats, seed=seed)
+        else:
+            self.world = GameWorld(self.stats, seed, width=self.grid_size, height=self.grid_size)
+        self.player = Player(self.world.width // 2, self.world.height // 2)
+        self.world.update_focus(self.player.position)
+        self.steps = 0
+
+    @classmethod
+    def load(cls, path: str) -> 'Simulation':
+        """Resume a simulation from a snapshot file"""
+        snapshot = Snapshot.load(path)
+        sim = cls.__new__(cls)
+        sim.chunked = snapshot.chunked
+        sim.grid_size = snapshot.width
+        sim.world, sim.player, sim.stats = snapshot.restore()
+        sim.steps = 0
+        return sim
+
+    def save(self, path: str) -> None:
+        """Write the current state to a snapshot file"""
+        save_snapshot(path, self.world, self.player, self.stats)
+
+    def facing_position(self) -> Tuple[int, int]:
+        """Get the cell the player is facing"""
+        return (self.player.x + self.player.direction[0],
+                self.player.y + self.player.direction[1])
+
+    def actions_to(self, goal: Tuple[int, int]) -> Optional[List[int]]:
+        """
+        Get the move actions of a shortest walk to goal, None if unreachable.
+        For a blocking goal such as a stick the last action turns the
+        player to face it instead of stepping onto it.
+        """
+        path = self.world.find_path(self.player.position, goal)
+        if path is None:
+            return None
+        actions = []
+        x, y = self.player.position
+        for next_x, next_y in path:
+            actions.append(DIRECTION_ACTIONS[(next_x - x, next_y - y)])
+            x, y = next_x, next_y
+        return actions
+
+    def step(self, action: int) -> bool:
+        """
+        Apply one action.
+        Returns True if the action changed the player position or the world.
+        """
+        self.steps += 1
+        direction = MOVE_DIRECTIONS.get(action)
+        if direction is not None:
+            moved = self.player.try_move(direction, self.world)
+            if moved:
+                self.player.snap_to_target()
+                self.stats.move_made()
+                self.world.update_focus(self.player.position)
+            return moved
+
+        if action == Action.COLLECT:
+            sticks_before = self.stats.sticks_collected
+            self.world.check_collection(self.facing_position(), self.stats)
+            return self.stats.sticks_collected != sticks_before
+        if action == Action.REMOVE_ROCK:
+            return self.world.try_remove_rock(self.facing_position(), self.stats)
+        return False
@@ -0,0 +1,135 @@
+import mmap
+import os
+import struct
+from array import array
+from typing import Dict, Tuple
+from entities.player import Player
+from world.game_world import GameWorld
+from world.chunked_world import ChunkedWorld
+from stats import GameStats
+
+SNAPSHOT_MAGIC = b'PUSW'
+SNAPSHOT_VERSION = 2
+FLAG_CHUNKED = 1
+
+# magic, version, flags, width, height, chunk size, seed, player x/y,
+# facing x/y, then the GameStats counters: moves, sticks, rocks, empty cells
+_HEADER = struct.Struct('<4sBBIIIQiibbqqqq')
+# Mersenne Twister state words of the world RNG
+_RNG_WORDS = 625
+# Chunk table entry: chunk key x/y and item count
+_CHUNK_ENTRY = struct.Struct('<iiI')
+
+def encode_snapshot(world, player: Player, stats: GameStats) -> bytes:
+    """
+    Encode the complete world state.
+    After the header and RNG state a plain world stores its rock and item
+    bitboards; spawns only depend on those and the RNG, so a resumed world
+    spawns exactly where the original would have. A chunked world stores
+    every generated chunk in the packed form it already uses for evicted
+    chunks.
+    """
+    chunked = isinstance(world, ChunkedWorld)
+    out = bytearray(_HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, FLAG_CHUNKED if chunked else 0,
+        world.width, world.height, world.chunk_size if chunked else 0, world.seed,
+        player.x, player.y, player.direction[0], player.direction[1],
+        stats.tiles_moved, stats.sticks_collected, stats.rocks_spawned, stats.empty_cells))
+    out += array('I', world.rng.getstate()[1]).tobytes()
+
+    if chunked:
+        for (key_x, key_y), (rock_bytes, item_bytes) in world.packed_chunks():
+            out += _CHUNK_ENTRY.pack(key_x, key_y, len(item_bytes) // 4)
+            out += rock_bytes
+            out += item_bytes
+    else:
+        layer_bytes = (world.board.size + 7) // 8
+        out += world.board.rocks.to_bytes(layer_bytes, 'little')
+        out += world.board.items.to_bytes(layer_bytes, 'little')
+
+    return bytes(out)
+
+def save_snapshot(path: str, world, player: Player, stats: GameStats) -> None:
+    """
+    Write the complete world state to a file.
+    The new file is written next to the old one and swapped in, so the old
+    snapshot is never truncated while it may still be memory-mapped, and a
+    failed save leaves it intact.
+    """
+    data = encode_snapshot(world, player, stats)
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'wb') as snapshot_file:
+        snapshot_file.write(data)
+    os.replace(temp_path, path)
+
+class Snapshot:
+    """
+    An encoded snapshot, usually a memory-mapped file.
+    Loading never parses the data entity by entity: plain world layers are
+    read straight from the buffer as bitboards, and chunked worlds copy out
+    their packed chunks as they are, unpacking each when first touched.
+    Nothing keeps a reference into the buffer once the world is restored.
+    """
+    def __init__(self, data):
+        self._view = memoryview(data)
+        (magic, version, flags, self.width, self.height, self.chunk_size, self.seed,
+         player_x, player_y, facing_x, facing_y,
+         self.tiles_moved, self.sticks_collected, self.rocks_spawned, self.empty_cells) = _HEADER.unpack_from(self._view)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"Not a version {SNAPSHOT_VERSION} snapshot")
+        self.chunked = bool(flags & FLAG_CHUNKED)
+        self.player_position = (player_x, player_y)
+        self.player_direction = [facing_x, facing_y]
+
+    @classmethod
+    def load(cls, path: str) -> 'Snapshot':
+        """Memory-map a snapshot file"""
+        with open(path, 'rb') as snapshot_file:
+            return cls(mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def _rng_state(self) -> tuple:
+        words = array('I')
+        words.frombytes(self._view[_HEADER.size:_HEADER.size + _RNG_WORDS * 4])
+        return (3, tuple(words), None)
+
+    def _packed_chunks(self, rock_bytes: int) -> Dict[Tuple[int, int], Tuple[bytes, bytes]]:
+        packed = {}
+        view = self._view
+        offset = _HEADER.size + _RNG_WORDS * 4
+        while offset < len(view):
+            key_x, key_y, item_count = _CHUNK_ENTRY.unpack_from(view, offset)
+            offset += _CHUNK_ENTRY.size
+            rocks = bytes(view[offset:offset + rock_bytes])
+            offset += rock_bytes
+            items = bytes(view[offset:offset + item_count * 4])
+            offset += item_count * 4
+            packed[(key_x, key_y)] = (rocks, items)
+        return packed
+
+    def restore(self) -> Tuple[object, Player, GameStats]:
+        """Build the world, player and stats saved in the snapshot"""
+        stats = GameStats()
+        if self.chunked:
+            world = ChunkedWorld(stats, self.width, self.chunk_size, self.seed)
+            world.load_packed_chunks(self._packed_chunks(world.packed_rock_bytes))
+        else:
+            world = GameWorld(stats, self.seed, generate=False, width=self.width, height=self.height)
+            layer_bytes = (world.board.size + 7) // 8
+            start = _HEADER.size + _RNG_WORDS * 4
+            world.load_layers(int.from_bytes(self._view[start:start + layer_bytes], 'little'),
+                              int.from_bytes(self._view[start + layer_bytes:start + 2 * layer_bytes], 'little'))
+        world.rng.setstate(self._rng_state())
+
+        stats.tiles_moved = self.tiles_moved
+        stats.sticks_collected = self.sticks_collected
+        stats.rocks_spawned = self.rocks_spawned
+        stats.empty_cells = self.empty_cells
+
+        player = Player(*self.player_position)
+        player.direction = self.player_direction
+        world.update_focus(player.position)
+        return world, player, stats
+
+def load_snapshot(path: str) -> Tuple[object, Player, GameStats]:
+    """Restore the world, player and stats from a snapshot file"""
+    return Snapshot.load(path).restore()
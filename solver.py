@@ -0,0 +1,352 @@
+import argparse
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from constants import GRID_SIZE, SOLVER_DEPTH, SOLVER_NODE_BUDGET, SOLVER_TABLE_BITS, SOLVER_WORKERS
+from world.bitboard import GridBoard
+from world.path_finder import splitmix64
+
+# Macro moves: walk next to a cell, face it and act on it
+COLLECT = 0
+REMOVE_ROCK = 1
+MOVE_NAMES = ('collect', 'remove_rock')
+
+# (rocks mask, rocks hash, stick cell or -1, player cell, sticks in hand, sticks collected)
+State = Tuple[int, int, int, int, int, int]
+Move = Tuple[int, int]  # (COLLECT or REMOVE_ROCK, cell the player stands on or removes)
+
+# Bit offsets of the 8 cells around a cell in ring order, filled in per width
+_RING = ((0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1))
+
+class _BudgetExhausted(Exception):
+    pass
+
+class GameTree:
+    """
+    The game as a tree of macro moves over compact bitboard states.
+    Walking is free, so from any state the player either collects the
+    stick from one of the cells next to it or spends a stick on a rock it
+    can reach. The rock placed after a collection follows the
+    spawn_new_rock rules exactly; new sticks come from a fixed stream keyed
+    on the world seed and the number of sticks collected, so a layout has
+    one well-defined optimum and move orders that reach the same board
+    share transposition table entries.
+    """
+    def __init__(self, width: int, height: int, seed: int = 0, table_bits: int = SOLVER_TABLE_BITS):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.board = GridBoard(width, height)
+        self._ring = [dy * width + dx for dx, dy in _RING]
+
+        # Replace-always transposition table of (key, depth, score, best move)
+        self._table: List[Optional[Tuple[int, int, int, Optional[Move]]]] = [None] * (1 << table_bits)
+        self._table_mask = (1 << table_bits) - 1
+        self.nodes = 0
+        self.node_budget: Optional[int] = None
+
+    def cell_key(self, index: int) -> int:
+        return splitmix64(index + self.seed * 0x100000000)
+
+    def initial_state(self, world, player, stats) -> State:
+        """Build the search state of a GameWorld, its player and stats"""
+        rocks = world.board.rocks & self.board.interior_mask
+        rocks_hash = 0
+        remaining = rocks
+        while remaining:
+            low = remaining & -remaining
+            rocks_hash ^= self.cell_key(low.bit_length() - 1)
+            remaining ^= low
+        items = world.board.items
+        stick = items.bit_length() - 1 if items else -1
+        return (rocks, rocks_hash, stick, player.y * self.width + player.x, stats.sticks_collected, 0)
+
+    def position_of(self, index: int) -> Tuple[int, int]:
+        return self.board.position_of(index)
+
+    def _locally_safe(self, open_cells: int, index: int) -> bool:
+        """Check if the open orthogonal neighbors of a cell stay linked around it (see ConnectivityIndex)"""
+        ring = [(open_cells >> (index + offset)) & 1 for offset in self._ring]
+        if all(ring):
+            return True
+        start = ring.index(0)
+        linked_runs = 0
+        run_has_neighbor = False
+        for step in range(1, 9):
+            ring_index = (start + step) % 8
+            if ring[ring_index]:
+                run_has_neighbor = run_has_neighbor or ring_index % 2 == 0
+            else:
+                linked_runs += run_has_neighbor
+                run_has_neighbor = False
+        return linked_runs == 1
+
+    def _can_place_rock(self, open_cells: int, index: int) -> bool:
+        """Same answer as GameWorld.is_map_accessible on a connected map"""
+        bit = 1 << index
+        if not open_cells & bit or open_cells == bit:
+            return False
+        if self._locally_safe(open_cells, index):
+            return True
+        remaining = open_cells & ~bit
+        return self.board.flood_fill(remaining & -remaining, remaining) == remaining
+
+    def _spawn_rock(self, rocks: int, stick: int) -> int:
+        """Cell where spawn_new_rock puts the rock after the stick at stick is collected, or -1"""
+        open_cells = self.board.interior_mask & ~rocks
+        # Candidates in row-major order like GameWorld.free_cells, skipping
+        # the collected stick's cell the way spawn_new_rock skips the
+        # position it is given. Open cells are always connected here, so
+        # the first locally safe cell wins, as in _get_spawn_candidate
+        candidates = open_cells & ~(1 << stick) if stick >= 0 else open_cells
+        for x, y in self.board.positions(candidates):
+            index = y * self.width + x
+            if self._locally_safe(open_cells, index):
+                return index
+        for x, y in self.board.positions(candidates):
+            index = y * self.width + x
+            if self._can_place_rock(open_cells, index):
+                return index
+        return -1
+
+    def _spawn_stick(self, rocks: int, collected: int) -> int:
+        """Cell of the next stick, drawn uniformly from the free cells"""
+        free = self.board.interior_mask & ~rocks
+        count = free.bit_count()
+        if not count:
+            return -1
+        target = random.Random(f"{self.seed}:{collected}").randrange(count)
+        # Skip whole 512 byte blocks before walking single bits
+        data = free.to_bytes((self.board.size + 7) // 8, 'little')
+        offset = 0
+        while True:
+            block = int.from_bytes(data[offset:offset + 512], 'little')
+            block_count = block.bit_count()
+            if target < block_count:
+                break
+            target -= block_count
+            offset += 512
+        for _ in range(target):
+            block &= block - 1
+        return offset * 8 + (block & -block).bit_length() - 1
+
+    def reachable(self, state: State) -> int:
+        """Cells the player can walk to; the stick blocks like any item"""
+        rocks, _, stick, player, _, _ = state
+        board = self.board
+        open_cells = board.interior_mask & ~rocks
+        player_bit = 1 << player
+        stick_bit = 1 << stick if stick >= 0 else 0
+        passable = (open_cells & ~stick_bit) | player_bit
+        # Open cells are always connected, so only the stick can cut some off
+        if (not stick_bit or self._locally_safe(open_cells, stick)) and board.neighbors(player_bit) & passable:
+            return passable
+        return board.flood_fill(player_bit, passable)
+
+    def moves(self, state: State, reach: int) -> List[Move]:
+        """Collections first, since they are the only moves that score"""
+        rocks, _, stick, _, hand, _ = state
+        board = self.board
+        moves = []
+        if stick >= 0:
+            sides = board.neighbors(1 << stick) & reach
+            for x, y in board.positions(sides):
+                moves.append((COLLECT, y * self.width + x))
+        if hand:
+            removable = board.neighbors(reach) & rocks
+            for x, y in board.positions(removable):
+                moves.append((REMOVE_ROCK, y * self.width + x))
+        return moves
+
+    def play(self, state: State, move: Move) -> Optional[State]:
+        """Apply a move; None when the collection ends the game because no rock can be placed"""
+        rocks, rocks_hash, stick, player, hand, collected = state
+        kind, cell = move
+        if kind == REMOVE_ROCK:
+            # Stand on any reachable cell next to the rock
+            reach = self.reachable(state)
+            standing = self.board.neighbors(1 << cell) & reach
+            return (rocks & ~(1 << cell), rocks_hash ^ self.cell_key(cell), stick,
+                    (standing & -standing).bit_length() - 1, hand - 1, collected)
+
+        rock = self._spawn_rock(rocks, stick)
+        if rock < 0:
+            return None
+        rocks |= 1 << rock
+        collected += 1
+        return (rocks, rocks_hash ^ self.cell_key(rock), self._spawn_stick(rocks, collected),
+                cell, hand + 1, collected)
+
+    def _state_key(self, state: State, reach: int) -> int:
+        """Zobrist key of the position; the player only matters through the region they can reach"""
+        _, rocks_hash, stick, _, hand, collected = state
+        anchor = (reach & -reach).bit_length()
+        return rocks_hash ^ splitmix64(splitmix64(splitmix64(stick + 1) ^ anchor) ^ (hand << 32 | collected))
+
+    def search(self, state: State, depth: int) -> int:
+        """Most sticks that can be collected within depth moves from state"""
+        self.nodes += 1
+        if depth == 0:
+            return 0
+        if self.node_budget is not None and self.nodes > self.node_budget:
+            raise _BudgetExhausted()
+
+        reach = self.reachable(state)
+        key = self._state_key(state, reach)
+        slot = key & self._table_mask
+        entry = self._table[slot]
+        first = None
+        if entry is not None and entry[0] == key:
+            # Keys include the collection count and hand, so a state is always
+            # at the same ply; a matching depth is an exact hit
+            if entry[1] == depth:
+                return entry[2]
+            first = entry[3]
+
+        moves = self.moves(state, reach)
+        if first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+
+        best = 0
+        best_move = None
+        for move in moves:
+            # A removal scores nothing itself
+            gain = 1 if move[0] == COLLECT else 0
+            if gain + depth - 1 <= best:
+                continue
+            child = self.play(state, move)
+            score = 0 if child is None else gain + self.search(child, depth - 1)
+            if score > best or best_move is None:
+                best = score
+                best_move = move
+                if best == depth:
+                    break
+
+        self._table[slot] = (key, depth, best, best_move)
+        return best
+
+    def principal_variation(self, state: State, depth: int) -> Tuple[List[Move], bool]:
+        """
+        Follow the best moves stored in the table from state.
+        Also returns False if the line ends the game.
+        """
+        line = []
+        while depth > 0:
+            reach = self.reachable(state)
+            key = self._state_key(state, reach)
+            entry = self._table[key & self._table_mask]
+            if entry is None or entry[0] != key or entry[3] is None:
+                break
+            line.append(entry[3])
+            state = self.play(state, entry[3])
+            if state is None:
+                return line, False
+            depth -= 1
+        return line, True
+
+    def iterative_deepening(self, state: State, max_depth: int,
+                            node_budget: Optional[int] = None) -> List[Tuple[int, List[Move], bool]]:
+        """
+        Search depth 1, 2, ... until max_depth or the node budget runs out.
+        Returns (score, best line, survives) for every finished depth.
+        """
+        self.node_budget = node_budget
+        results = []
+        try:
+            for depth in range(1, max_depth + 1):
+                score = self.search(state, depth)
+                results.append((score, *self.principal_variation(state, depth)))
+        except _BudgetExhausted:
+            pass
+        return results
+
+def _search_root_move(width: int, height: int, seed: int, state: State, move: Move, max_depth: int,
+                      node_budget: int, table_bits: int) -> Tuple[List[Tuple[int, List[Move], bool]], int]:
+    """Worker job: iterative deepening below one root move; scores include the root move"""
+    tree = GameTree(width, height, seed, table_bits)
+    gain = 1 if move[0] == COLLECT else 0
+    child = tree.play(state, move)
+    if child is None:
+        # The collection itself ends the game, at every depth
+        return [(0, [move], False)] * max_depth, 1
+    results = [(gain, [move], True)]
+    for score, line, survives in tree.iterative_deepening(child, max_depth - 1, node_budget):
+        results.append((gain + score, [move] + line, survives))
+    return results, tree.nodes + 1
+
+class SolveResult:
+    """Best line found for a layout"""
+    def __init__(self, score: int, depth: int, line: List[Tuple[str, Tuple[int, int]]], survived: bool,
+                 nodes: int, elapsed: float):
+        self.score = score  # Sticks collected along the best line
+        self.depth = depth  # Moves searched to, for every root move
+        self.line = line  # (move name, cell) in play order
+        self.survived = survived  # False if even the best line ends the game
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        outcome = "survives" if self.survived else "game over"
+        return (f"Best score {self.score} sticks within {self.depth} moves ({outcome}), "
+                f"{self.nodes} nodes in {self.elapsed:.2f}s ({self.nodes_per_second:.0f} nodes/s)")
+
+def solve(world, player, stats, max_depth: int = SOLVER_DEPTH, node_budget: int = SOLVER_NODE_BUDGET,
+          workers: Optional[int] = SOLVER_WORKERS, table_bits: int = SOLVER_TABLE_BITS) -> SolveResult:
+    """
+    Find the most sticks that can be collected from a GameWorld state.
+    Each root move is searched with iterative deepening in its own worker
+    process, sharing the node budget evenly. Root moves are compared at
+    the deepest depth every one of them finished.
+    """
+    start = time.perf_counter()
+    tree = GameTree(world.width, world.height, world.seed, table_bits)
+    state = tree.initial_state(world, player, stats)
+    root_moves = tree.moves(state, tree.reachable(state))
+    if not root_moves or max_depth < 1:
+        return SolveResult(0, max_depth, [], True, 1, time.perf_counter() - start)
+
+    args = [(world.width, world.height, world.seed, state, move, max_depth,
+             max(1, node_budget // len(root_moves)), table_bits) for move in root_moves]
+    if workers == 1 or len(root_moves) == 1:
+        outcomes = [_search_root_move(*job) for job in args]
+    else:
+        # Spawned workers never inherit the parent's pygame state
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            outcomes = list(executor.map(_search_root_move, *zip(*args)))
+
+    depth = min(len(results) for results, _ in outcomes)
+    nodes = 1 + sum(move_nodes for _, move_nodes in outcomes)
+    # Prefer lines that keep the game going when scores tie
+    score, best_line, survived = max((results[depth - 1] for results, _ in outcomes),
+                                     key=lambda result: (result[0], result[2]))
+    line = [(MOVE_NAMES[kind], tree.position_of(cell)) for kind, cell in best_line]
+    return SolveResult(score, depth, line, survived, nodes, time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description='Search for the best achievable score of a Pick Up Sticks layout')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the generated layout')
+    parser.add_argument('--grid-size', type=int, default=GRID_SIZE, help='Cells per side of the map')
+    parser.add_argument('--snapshot', metavar='FILE', help='Solve the world saved in a snapshot instead')
+    parser.add_argument('--depth', type=int, default=SOLVER_DEPTH, help='Most moves to search')
+    parser.add_argument('--nodes', type=int, default=SOLVER_NODE_BUDGET, help='Node budget for the whole search')
+    parser.add_argument('--workers', type=int, default=SOLVER_WORKERS, help='Worker processes, default one per CPU')
+    args = parser.parse_args()
+
+    from simulation import Simulation
+    sim = Simulation.load(args.snapshot) if args.snapshot else Simulation(args.seed, grid_size=args.grid_size)
+    if sim.chunked:
+        parser.error('chunked worlds cannot be solved')
+    result = solve(sim.world, sim.player, sim.stats, args.depth, args.nodes, args.workers)
+    print(result)
+    for name, cell in result.line:
+        print(f"  {name} {cell}")
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,56 @@
 from constants import GRID_SIZE
+from world.events import Change, ChangeEvent
 
 class GameStats:
-    def __init__(self):
+    def __init__(self, width: int = GRID_SIZE, height: int = GRID_SIZE):
         self.tiles_moved = 0
         self.sticks_collected = 0
         self.rocks_spawned = 0
-        self.empty_cells = (GRID_SIZE - 2) * (GRID_SIZE - 2)  # Initial empty cells (inner area)
+        self.empty_cells = (width - 2) * (height - 2)  # Initial empty cells (inner area)
+        self.version = 0  # Bumped on every counter change, for redraw tracking
     
     def move_made(self):
         self.tiles_moved += 1
+        self.version += 1
     
     def stick_collected(self):
         self.sticks_collected += 1
+        self.version += 1
     
     def rock_spawned(self):
         self.rocks_spawned += 1
         self.empty_cells -= 1
+        self.version += 1
 
     def rock_removed(self):
         """Called when a rock is removed by spending a stick"""
         self.rocks_spawned -= 1
         self.empty_cells += 1
+        self.version += 1
 
     def spend_stick(self):
         """Spend a stick point to remove a rock"""
         if self.sticks_collected > 0:
             self.sticks_collected -= 1
+            self.version += 1
             return True
         return False
 
     def set_initial_rocks(self, rock_count: int):
         """Call this after generating initial rocks"""
         self.rocks_spawned = rock_count
-        self.empty_cells -= rock_count
\ No newline at end of file
+        self.empty_cells -= rock_count
+        self.version += 1
+
+def apply_change(event: ChangeEvent) -> None:
+    """Count a game action against the stats of whoever made it; worlds listen with this immediately"""
+    stats = event.stats
+    if stats is None:
+        return
+    if event.change == Change.STICK_COLLECTED:
+        stats.stick_collected()
+    elif event.change == Change.ROCK_SPAWNED:
+        stats.rock_spawned()
+    elif event.change == Change.ROCK_REMOVED:
+        stats.spend_stick()
+        stats.rock_removed()
@@ -0,0 +1,220 @@
+import json
+import time
+from array import array
+from functools import wraps
+from typing import Dict, Iterable, List, Tuple
+from constants import TELEMETRY_SAMPLES, TELEMETRY_PRECISION_BITS, TELEMETRY_OVERLAY_INTERVAL
+
+class RingBuffer:
+    """Fixed-size buffer of the most recent integer samples"""
+    def __init__(self, capacity: int = TELEMETRY_SAMPLES):
+        self._samples = array('q', bytes(8 * capacity))
+        self._next = 0
+        self.count = 0
+
+    def append(self, value: int) -> None:
+        samples = self._samples
+        samples[self._next] = value
+        self._next = (self._next + 1) % len(samples)
+        if self.count < len(samples):
+            self.count += 1
+
+    def values(self) -> List[int]:
+        """Samples from oldest to newest"""
+        if self.count < len(self._samples):
+            return self._samples[:self.count].tolist()
+        return (self._samples[self._next:] + self._samples[:self._next]).tolist()
+
+class Histogram:
+    """
+    HDR-style histogram of non-negative integers.
+    Values below 2**precision_bits get a bucket each; above that every
+    power of two range is split into 2**precision_bits linear buckets, so
+    recording is a couple of integer operations, memory stays constant and
+    any percentile is exact to within 1 part in 2**precision_bits.
+    """
+    def __init__(self, precision_bits: int = TELEMETRY_PRECISION_BITS):
+        self._bits = precision_bits
+        self._counts = [0] * ((66 - precision_bits) << precision_bits)
+        self._top = 0  # Highest bucket in use
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self._bits - 1
+        if shift <= 0:
+            return value
+        return (shift << self._bits) + (value >> shift)
+
+    def _highest_value(self, index: int) -> int:
+        """Largest value that lands in a bucket"""
+        if index < 2 << self._bits:
+            return index
+        shift = (index >> self._bits) - 1
+        return ((index - (shift << self._bits) + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        index = self._index(value)
+        self._counts[index] += 1
+        if index > self._top:
+            self._top = index
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent: float) -> int:
+        """Value that percent of the recorded values are at or below"""
+        if not self.count:
+            return 0
+        target = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index in range(self._top + 1):
+            seen += self._counts[index]
+            if seen >= target:
+                return min(self._highest_value(index), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def reset(self) -> None:
+        self._counts = [0] * len(self._counts)
+        self._top = 0
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+class Series:
+    """Recent samples and the all-time distribution of one metric"""
+    def __init__(self, name: str, unit: str, scale: float = 1.0):
+        self.name = name
+        self.unit = unit
+        self.scale = scale  # Multiplier from recorded integers to unit
+        self.recent = RingBuffer()
+        self.histogram = Histogram()
+
+    def record(self, value: int) -> None:
+        self.recent.append(value)
+        self.histogram.record(value)
+
+    def summary(self) -> dict:
+        histogram = self.histogram
+        scale = self.scale
+        return {
+            'unit': self.unit,
+            'count': histogram.count,
+            'mean': histogram.mean * scale,
+            'p50': histogram.percentile(50) * scale,
+            'p99': histogram.percentile(99) * scale,
+            'max': histogram.max * scale,
+        }
+
+class Telemetry:
+    """
+    Frame phase timings and game metrics.
+    Methods are timed by swapping a timing wrapper onto their instance
+    while telemetry is enabled; disabling removes the wrappers again, so
+    a disabled Telemetry adds no work at all to the timed calls.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled = False
+        self.series: Dict[str, Series] = {}
+        self._targets: List[Tuple[object, str, str]] = []  # (object, method name, series name)
+        self._overlay_time = 0.0
+        self._overlay_summary: Dict[str, dict] = {}
+        if enabled:
+            self.enable()
+
+    def get_series(self, name: str, unit: str = 'ms', scale: float = 1e-6) -> Series:
+        """Get a metric's series, creating it on first use (timings are recorded in ns)"""
+        series = self.series.get(name)
+        if series is None:
+            series = self.series[name] = Series(name, unit, scale)
+        return series
+
+    def record(self, name: str, value: int, unit: str = '') -> None:
+        """Record a game metric sample, e.g. the ticks run in a frame"""
+        if self.enabled:
+            self.get_series(name, unit, 1.0).record(value)
+
+    def record_time(self, name: str, nanoseconds: int) -> None:
+        if self.enabled:
+            self.get_series(name).record(nanoseconds)
+
+    def instrument(self, target: object, methods: Iterable[str], prefix: str) -> None:
+        """Time every call of the named methods of target as 'prefix.method'"""
+        for method in methods:
+            entry = (target, method, f"{prefix}.{method}")
+            self._targets.append(entry)
+            if self.enabled:
+                self._wrap(*entry)
+
+    def release(self, target: object) -> None:
+        """Stop timing the methods of target, e.g. a world that was replaced"""
+        for entry in [entry for entry in self._targets if entry[0] is target]:
+            self._targets.remove(entry)
+            if self.enabled:
+                self._unwrap(entry[0], entry[1])
+
+    def _wrap(self, target: object, method: str, name: str) -> None:
+        original = getattr(target, method)
+        series = self.get_series(name)
+        clock = time.perf_counter_ns
+
+        @wraps(original)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                series.record(clock() - start)
+        setattr(target, method, timed)
+
+    def _unwrap(self, target: object, method: str) -> None:
+        # The class attribute shows through again
+        target.__dict__.pop(method, None)
+
+    def enable(self) -> None:
+        if not self.enabled:
+            self.enabled = True
+            for entry in self._targets:
+                self._wrap(*entry)
+
+    def disable(self) -> None:
+        if self.enabled:
+            self.enabled = False
+            for target, method, _ in self._targets:
+                self._unwrap(target, method)
+
+    def reset(self) -> None:
+        """Forget every recorded sample"""
+        self.series.clear()
+        if self.enabled:
+            # Point the installed wrappers at fresh series
+            for target, method, _ in self._targets:
+                self._unwrap(target, method)
+            for entry in self._targets:
+                self._wrap(*entry)
+
+    def summary(self) -> Dict[str, dict]:
+        return {name: series.summary() for name, series in sorted(self.series.items())}
+
+    def summary_cached(self) -> Dict[str, dict]:
+        """summary(), recomputed at most every TELEMETRY_OVERLAY_INTERVAL seconds for per-frame display"""
+        now = time.perf_counter()
+        if now - self._overlay_time >= TELEMETRY_OVERLAY_INTERVAL:
+            self._overlay_time = now
+            self._overlay_summary = self.summary()
+        return self._overlay_summary
+
+    def export(self, path: str) -> None:
+        """Write every series' summary and recent samples to a JSON file"""
+        report = {}
+        for name, series in sorted(self.series.items()):
+            report[name] = series.summary()
+            report[name]['recent'] = [value * series.scale for value in series.recent.values()]
+        with open(path, 'w') as export_file:
+            json.dump(report, export_file, indent=2)
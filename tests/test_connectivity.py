@@ -0,0 +1,75 @@
+import random
+import unittest
+from entities.kinds import KIND_NONE, KIND_ROCK
+from world.bitboard import GridBoard
+from world.connectivity import ConnectivityIndex
+from world.path_finder import PathFinder
+
+def bordered_board(width: int, height: int) -> GridBoard:
+    board = GridBoard(width, height)
+    for x in range(width):
+        board.set_kind((x, 0), KIND_ROCK)
+        board.set_kind((x, height - 1), KIND_ROCK)
+    for y in range(height):
+        board.set_kind((0, y), KIND_ROCK)
+        board.set_kind((width - 1, y), KIND_ROCK)
+    return board
+
+class ConnectivityIndexTest(unittest.TestCase):
+    def assert_matches_path_finder(self, board: GridBoard, index: ConnectivityIndex) -> None:
+        rocks = set(board.positions(board.rocks))
+        for y in range(board.height):
+            for x in range(board.width):
+                expected = PathFinder.is_map_accessible(rocks, (x, y), board.width, board.height)
+                self.assertEqual(index.can_place_rock((x, y)), expected, (x, y))
+
+    def test_fresh_board_is_connected_without_rebuild(self):
+        board = bordered_board(12, 9)
+        index = ConnectivityIndex(board, 1, 1, 10, 7)
+        self.assertTrue(index.is_connected())
+        self.assertTrue(index._dirty)
+
+    def test_cut_vertices_match_path_finder(self):
+        rng = random.Random(1)
+        for width, height in ((5, 5), (8, 6), (12, 12)):
+            board = bordered_board(width, height)
+            index = ConnectivityIndex(board, 1, 1, width - 2, height - 2)
+            interior = [(x, y) for y in range(1, height - 1) for x in range(1, width - 1)]
+            for _ in range(3 * len(interior)):
+                pos = rng.choice(interior)
+                # Any change, including ones that disconnect the map
+                if board.set_kind(pos, KIND_NONE if board.is_rock(pos) else KIND_ROCK) == KIND_ROCK:
+                    index.remove_rock(pos)
+                else:
+                    index.add_rock(pos)
+                if rng.random() < 0.2:
+                    self.assert_matches_path_finder(board, index)
+
+    def test_locally_safe_rocks_keep_the_map_connected(self):
+        rng = random.Random(2)
+        board = bordered_board(15, 15)
+        index = ConnectivityIndex(board, 1, 1, 13, 13)
+        interior = [(x, y) for y in range(1, 14) for x in range(1, 14)]
+        rng.shuffle(interior)
+        for pos in interior:
+            if index.is_locally_safe(pos):
+                self.assertTrue(index.can_place_rock(pos), pos)
+                board.set_kind(pos, KIND_ROCK)
+                index.add_rock(pos)
+        self.assertTrue(PathFinder.is_board_accessible(board))
+        self.assertTrue(index.is_connected())
+
+    def test_isolated_cell_is_the_only_place_that_reconnects(self):
+        board = bordered_board(7, 7)
+        index = ConnectivityIndex(board, 1, 1, 5, 5)
+        # Wall off (1, 1) completely
+        for pos in ((2, 1), (1, 2), (2, 2)):
+            board.set_kind(pos, KIND_ROCK)
+            index.add_rock(pos)
+        self.assertFalse(index.is_connected())
+        self.assertTrue(index.can_place_rock((1, 1)))
+        self.assertFalse(index.can_place_rock((4, 4)))
+        self.assert_matches_path_finder(board, index)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from entities.items import Stick
+from entities.kinds import KIND_ROCK, KIND_STICK
+from stats import GameStats
+from world.events import Change, ChangeEvent, ChangeStream
+from world.game_world import GameWorld
+
+class ChangeStreamTest(unittest.TestCase):
+    def test_immediate_listeners_see_each_event_as_emitted(self):
+        stream = ChangeStream()
+        seen = []
+        stream.subscribe(seen.append, batched=False)
+        stream.emit(Change.ENTITY_ADDED, (1, 2), KIND_ROCK)
+        self.assertEqual(seen, [ChangeEvent(Change.ENTITY_ADDED, (1, 2), KIND_ROCK)])
+
+    def test_batched_listeners_get_one_list_per_flush(self):
+        stream = ChangeStream()
+        batches = []
+        stream.subscribe(batches.append)
+        stream.emit(Change.ENTITY_ADDED, (1, 1), KIND_STICK)
+        stream.emit(Change.ENTITY_REMOVED, (1, 1), KIND_STICK)
+        self.assertEqual(batches, [])
+        stream.flush()
+        stream.flush()
+        self.assertEqual([[event.change for event in batch] for batch in batches],
+                         [[Change.ENTITY_ADDED, Change.ENTITY_REMOVED]])
+
+    def test_nothing_is_buffered_without_listeners(self):
+        stream = ChangeStream()
+        stream.emit(Change.ENTITY_ADDED, (1, 1), KIND_ROCK)
+        self.assertFalse(stream.active)
+        self.assertEqual(stream._pending, [])
+
+        batches = []
+        stream.subscribe(batches.append)
+        stream.emit(Change.ENTITY_ADDED, (2, 2), KIND_ROCK)
+        stream.unsubscribe(batches.append)
+        self.assertFalse(stream.active)
+        self.assertEqual(stream._pending, [])
+        stream.flush()
+        self.assertEqual(batches, [])
+
+    def test_world_changes_reach_listeners_once_per_tick(self):
+        stats = GameStats(8, 8)
+        world = GameWorld(stats, 1, width=8, height=8, rock_count=0)
+        batches = []
+        world.events.subscribe(batches.append)
+        stick = world.items[0]
+        world.check_collection(stick.position, stats)
+        self.assertEqual(batches, [])
+        world.update(0.1)
+        changes = [event.change for event in batches[0]]
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(changes.count(Change.STICK_COLLECTED), 1)
+        self.assertEqual(changes.count(Change.ROCK_SPAWNED), 1)
+        # Stats follow the same events immediately
+        self.assertEqual((stats.sticks_collected, stats.rocks_spawned), (1, 1))
+        self.assertIsInstance(world.get_entity_at(world.items[0].position), Stick)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import random
+import unittest
+from entities.kinds import KIND_NONE, KIND_ROCK, KIND_STICK
+from world.bitboard import GridBoard
+from world.free_cells import FreeCellIndex
+
+class FreeCellIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(3)
+
+    def free_list(self, board: GridBoard):
+        return [(x, y) for y in range(1, board.height - 1) for x in range(1, board.width - 1)
+                if board.kind_at((x, y)) == KIND_NONE]
+
+    def assert_matches_list(self, board: GridBoard, index: FreeCellIndex) -> None:
+        free = self.free_list(board)
+        self.assertEqual(len(index), len(free))
+        self.assertEqual(list(index), free)
+        for rank in sorted(self.rng.sample(range(len(free)), min(len(free), 20))):
+            self.assertEqual(index._select(rank), free[rank])
+            self.assertEqual(index._rank(free[rank]), rank)
+
+    def mutate(self, board: GridBoard, index: FreeCellIndex, steps: int) -> None:
+        """Random changes made the way worlds make them"""
+        for _ in range(steps):
+            pos = (self.rng.randrange(1, board.width - 1), self.rng.randrange(1, board.height - 1))
+            kind = self.rng.choice((KIND_NONE, KIND_ROCK, KIND_STICK))
+            if kind == KIND_NONE:
+                if board.set_kind(pos, KIND_NONE) != KIND_NONE:
+                    index.add(pos)
+            elif board.kind_at(pos) == KIND_NONE:
+                index.remove(pos)
+                board.set_kind(pos, kind)
+
+    def test_counts_and_order_match_a_plain_list(self):
+        # Rows wider than one block, and one block per row
+        for width, height in ((150, 7), (10, 10), (3, 3)):
+            board = GridBoard(width, height)
+            index = FreeCellIndex(board)
+            self.assert_matches_list(board, index)
+            for _ in range(5):
+                self.mutate(board, index, 200)
+                self.assert_matches_list(board, index)
+
+    def test_reset_recounts_from_the_board(self):
+        board = GridBoard(100, 8)
+        index = FreeCellIndex(board)
+        len(index)
+        for x in range(1, 99, 3):
+            board.set_kind((x, 4), KIND_ROCK)
+        index.reset()
+        # Changes made before the recount must not be counted twice
+        self.mutate(board, index, 100)
+        self.assert_matches_list(board, index)
+
+    def test_sample_picks_from_a_plain_list(self):
+        board = GridBoard(140, 9)
+        index = FreeCellIndex(board)
+        self.mutate(board, index, 600)
+        free = self.free_list(board)
+        for seed in range(200):
+            exclude = free[seed % len(free)] if seed % 2 else None
+            candidates = [pos for pos in free if pos != exclude]
+            expected = candidates[random.Random(seed).randrange(len(candidates))]
+            self.assertEqual(index.sample(random.Random(seed), exclude), expected)
+
+    def test_sample_on_a_full_board(self):
+        board = GridBoard(4, 3)
+        index = FreeCellIndex(board)
+        index.remove((1, 1))
+        board.set_kind((1, 1), KIND_ROCK)
+        self.assertEqual(index.sample(self.rng, (2, 1)), None)
+        self.assertEqual(index.sample(self.rng), (2, 1))
+        index.remove((2, 1))
+        board.set_kind((2, 1), KIND_STICK)
+        self.assertIsNone(index.sample(self.rng))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from entities.obstacles import Rock
+from stats import GameStats
+from world.game_world import GameWorld
+from world.update_scheduler import UpdateScheduler
+
+class Ticker(Rock):
+    """Rock with behavior: records the dt of every update"""
+    __slots__ = ('updates',)
+    update_interval = 0.1
+
+    def __init__(self, x: int, y: int):
+        super().__init__(x, y)
+        self.updates = []
+
+    def update(self, dt: float) -> None:
+        self.updates.append(round(dt, 6))
+
+class UpdateSchedulerTest(unittest.TestCase):
+    def test_updates_every_interval_with_elapsed_time(self):
+        scheduler = UpdateScheduler()
+        fast, slow = Ticker(1, 1), Ticker(2, 2)
+        scheduler.schedule(fast)
+        scheduler.schedule(slow, interval=0.25)
+        for _ in range(5):
+            scheduler.update(0.1)
+        self.assertEqual(fast.updates, [0.1] * 5)
+        self.assertEqual(slow.updates, [0.1, 0.3])
+
+    def test_sleep_and_wake(self):
+        scheduler = UpdateScheduler()
+        ticker = Ticker(1, 1)
+        scheduler.schedule(ticker)
+        scheduler.update(0.1)
+        scheduler.sleep(ticker)
+        self.assertEqual(len(scheduler), 0)
+        self.assertIn(ticker, scheduler)
+        for _ in range(3):
+            scheduler.update(0.1)
+        self.assertEqual(len(ticker.updates), 1)
+        scheduler.wake(ticker)
+        scheduler.update(0.1)
+        # Time spent asleep is not passed on
+        self.assertEqual(ticker.updates, [0.1, 0.1])
+
+    def test_unschedule_stops_updates(self):
+        scheduler = UpdateScheduler()
+        ticker = Ticker(1, 1)
+        scheduler.schedule(ticker)
+        scheduler.update(0.1)
+        scheduler.unschedule(ticker)
+        for _ in range(10):
+            scheduler.update(0.1)
+        self.assertNotIn(ticker, scheduler)
+        self.assertEqual(len(ticker.updates), 1)
+        # Waking a removed entity does nothing
+        scheduler.wake(ticker)
+        scheduler.update(0.1)
+        self.assertEqual(len(ticker.updates), 1)
+
+    def test_unschedule_during_the_same_tick(self):
+        scheduler = UpdateScheduler()
+        victim = Ticker(2, 2)
+
+        class Remover(Ticker):
+            __slots__ = ()
+            def update(self, dt: float) -> None:
+                scheduler.unschedule(victim)
+
+        scheduler.schedule(Remover(1, 1))
+        scheduler.schedule(victim)
+        scheduler.update(0.1)
+        self.assertEqual(victim.updates, [])
+
+    def test_world_removal_unschedules_the_placed_entity(self):
+        world = GameWorld(GameStats(), 1, width=8, height=8, rock_count=0)
+        ticker = Ticker(*next(iter(world.free_cells)))
+        world.add_to_grid(ticker)
+        self.assertIs(world.get_entity_at(ticker.position), ticker)
+        world.update(0.1)
+        world.remove_from_grid(ticker.position)
+        for _ in range(10):
+            world.update(0.1)
+        self.assertNotIn(ticker, world.scheduler)
+        self.assertEqual(len(ticker.updates), 1)
+        self.assertIsNone(world.get_entity_at(ticker.position))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import time
+from typing import Callable, Iterator
+from constants import TICK_RATE, MAX_TICKS_PER_FRAME
+
+class FixedTimestep:
+    """
+    Paces simulation ticks at a fixed rate, independent of rendering.
+    Real elapsed time goes into an accumulator that is drained in whole
+    ticks; the leftover fraction of a tick is the render interpolation
+    factor. When the machine falls behind, up to max_ticks_per_frame ticks
+    run back to back (skipping frames) and any backlog beyond that is
+    dropped so the game slows down instead of spiralling.
+    """
+    def __init__(self, tick_rate: int = TICK_RATE, max_ticks_per_frame: int = MAX_TICKS_PER_FRAME,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.tick_dt = 1.0 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self._clock = clock
+        self._last_time = clock()
+        self._accumulator = 0.0
+        self.tick_count = 0
+        self.dropped_ticks = 0
+
+    @property
+    def time(self) -> float:
+        """Simulation time in seconds"""
+        return self.tick_count * self.tick_dt
+
+    @property
+    def alpha(self) -> float:
+        """How far the real time is between the last tick and the next one, in [0, 1)"""
+        return self._accumulator / self.tick_dt
+
+    def advance(self) -> int:
+        """Measure the elapsed real time and return how many ticks to run now"""
+        now = self._clock()
+        self._accumulator += now - self._last_time
+        self._last_time = now
+
+        ticks = int(self._accumulator / self.tick_dt)
+        if ticks > self.max_ticks_per_frame:
+            self.dropped_ticks += ticks - self.max_ticks_per_frame
+            ticks = self.max_ticks_per_frame
+            self._accumulator = 0.0
+        else:
+            self._accumulator -= ticks * self.tick_dt
+        return ticks
+
+    def resync(self) -> None:
+        """Restart timing from now, so time spent blocked while idle isn't treated as lag"""
+        self._last_time = self._clock()
+        self._accumulator = 0.0
+
+    def ticks(self) -> Iterator[int]:
+        """Yield the number of each tick that is due, advancing simulation time as they run"""
+        for _ in range(self.advance()):
+            yield self.tick_count
+            self.tick_count += 1
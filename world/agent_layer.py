@@ -0,0 +1,121 @@
+# world/agent_layer.py
+from typing import Dict, Iterator, List, Optional, Tuple
+from entities.player import Player
+from stats import GameStats
+
+class AgentLayer:
+    """
+    Cells held by the agents sharing a world, kept apart from the entity
+    grid so that walking agents never invalidate the distance fields.
+    Agents ask for moves during a tick and resolve() applies them all at
+    once: when several agents want the same cell the first request wins,
+    an agent may follow one that moves out of its way, rotations of three
+    or more agents go through, and two agents can't swap cells. Each
+    agent has its own GameStats, sized for this world.
+    """
+    def __init__(self, world):
+        self.world = world
+        self.cells: Dict[Tuple[int, int], Player] = {}
+        self.stats: Dict[Player, GameStats] = {}
+        self._requests: Dict[Player, List[int]] = {}  # Direction per agent, in request order
+
+    def __len__(self) -> int:
+        return len(self.stats)
+
+    def __iter__(self) -> Iterator[Player]:
+        return iter(self.stats)
+
+    def __contains__(self, position: Tuple[int, int]) -> bool:
+        return position in self.cells
+
+    def agent_at(self, position: Tuple[int, int]) -> Optional[Player]:
+        return self.cells.get(position)
+
+    def add(self, agent: Player, stats: Optional[GameStats] = None) -> GameStats:
+        """Place an agent on its cell and return its stats"""
+        position = agent.position
+        if position in self.cells or self.world.is_blocking(position):
+            raise ValueError(f"Cell {position} is already taken")
+        self.cells[position] = agent
+        if stats is None:
+            stats = GameStats(self.world.width, self.world.height)
+            # Joining a world in progress: start from its current count
+            stats.empty_cells = self.world.stats.empty_cells
+        self.stats[agent] = stats
+        return stats
+
+    def remove(self, agent: Player) -> None:
+        if self.stats.pop(agent, None) is not None:
+            del self.cells[agent.position]
+            self._requests.pop(agent, None)
+
+    def request_move(self, agent: Player, direction: List[int]) -> None:
+        """Ask to move an agent one cell this tick; a later request replaces an earlier one"""
+        self._requests[agent] = direction
+
+    def resolve(self) -> List[Player]:
+        """
+        Apply every requested move and return the agents that moved.
+        Each claimed cell has at most one claimant, so the claims form
+        chains and cycles that are each walked once: the cost is linear
+        in the number of requests, not the number of agents.
+        """
+        requests, self._requests = self._requests, {}
+        world = self.world
+        cells = self.cells
+
+        # Claim target cells; walls, rocks and sticks refuse a move outright
+        targets: Dict[Player, Tuple[int, int]] = {}
+        claimed = set()
+        for agent, direction in requests.items():
+            agent.direction = direction
+            if agent.is_moving:
+                continue
+            target = (agent.x + direction[0], agent.y + direction[1])
+            if not (0 < target[0] < world.width - 1 and 0 < target[1] < world.height - 1):
+                continue
+            if target in claimed or world.is_blocking(target):
+                continue
+            claimed.add(target)
+            targets[agent] = target
+
+        # An agent moves if its target is empty or held by an agent that moves
+        moves: Dict[Player, bool] = {}
+        for agent in targets:
+            if agent in moves:
+                continue
+            chain: List[Player] = []
+            chain_index: Dict[Player, int] = {}
+            current = agent
+            while True:
+                if current in moves:
+                    result = moves[current]
+                    break
+                if current in chain_index:
+                    # Back at an agent of this chain: a cycle, which can't be a swap
+                    cycle = chain[chain_index[current]:]
+                    result = len(cycle) > 2
+                    break
+                target = targets.get(current)
+                if target is None:
+                    # The agent in the way stays put
+                    result = False
+                    break
+                chain_index[current] = len(chain)
+                chain.append(current)
+                current = cells.get(target)
+                if current is None:
+                    result = True
+                    break
+            for member in chain:
+                moves[member] = result
+
+        moved = [agent for agent, result in moves.items() if result]
+        for agent in moved:
+            del cells[agent.position]
+        for agent in moved:
+            target = targets[agent]
+            cells[target] = agent
+            agent.step_to(target)
+            self.stats[agent].move_made()
+        return moved
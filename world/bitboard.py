@@ -0,0 +1,173 @@
+# world/bitboard.py
+import re
+from functools import cached_property
+from typing import Iterable, Iterator, Optional, Tuple
+from entities.kinds import KIND_NONE, KIND_ROCK, KIND_STICK
+
+# bytes.translate tables turning cell kinds into '0'/'1' digits of one layer
+_LAYER_DIGITS = {kind: bytes(ord('1') if cell == kind else ord('0') for cell in range(256))
+                 for kind in (KIND_ROCK, KIND_STICK)}
+# And '0'/'1' digits back into rock cells
+_ROCK_CELLS = bytes(KIND_ROCK if digit == ord('1') else KIND_NONE for digit in range(256))
+_NONZERO_BYTE = re.compile(rb'[^\x00]')
+
+class GridBoard:
+    """
+    Compact occupancy for a width x height grid.
+    cells holds the kind of each cell in one byte and is the source of
+    truth, so single cells are read and changed in O(1) without tuples or
+    entity objects. Whole-board work such as flood fills and neighbor
+    queries runs on bitboard layers, ints with one bit per cell
+    (bit y * width + x), which are derived from cells when first read after
+    a change, in one linear pass.
+    """
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.cells = bytearray(self.size)
+        # Layers derived from cells, None until read again after a change
+        self._rocks: Optional[int] = 0
+        self._items: Optional[int] = 0
+
+    @classmethod
+    def from_rocks(cls, rocks: Iterable[Tuple[int, int]], width: int, height: int) -> 'GridBoard':
+        """Build a board holding just the given rock positions"""
+        board = cls(width, height)
+        for pos in rocks:
+            if board.in_bounds(pos):
+                board.set_kind(pos, KIND_ROCK)
+        return board
+
+    # Geometry masks are only built for boards that do whole-board work
+
+    @cached_property
+    def full_mask(self) -> int:
+        return (1 << self.size) - 1
+
+    @cached_property
+    def _first_column(self) -> int:
+        # One bit at the start of every row: sum of 1 << (y * width)
+        return self.full_mask // ((1 << self.width) - 1)
+
+    @cached_property
+    def not_left_column(self) -> int:
+        return self.full_mask & ~self._first_column
+
+    @cached_property
+    def not_right_column(self) -> int:
+        return self.full_mask & ~(self._first_column << (self.width - 1))
+
+    @cached_property
+    def interior_mask(self) -> int:
+        """Everything except the border ring"""
+        row_mask = (1 << self.width) - 1
+        inner_row = (row_mask >> 2) << 1
+        return (self._first_column * inner_row) & ~row_mask & ~(row_mask << (self.width * (self.height - 1)))
+
+    def in_bounds(self, pos: Tuple[int, int]) -> bool:
+        """Check if a position lies on the board"""
+        return 0 <= pos[0] < self.width and 0 <= pos[1] < self.height
+
+    def is_interior(self, pos: Tuple[int, int]) -> bool:
+        """Check if a position lies on the board and off its border ring"""
+        return 0 < pos[0] < self.width - 1 and 0 < pos[1] < self.height - 1
+
+    def index(self, pos: Tuple[int, int]) -> int:
+        """Get the cell index of a position"""
+        return pos[1] * self.width + pos[0]
+
+    def bit(self, pos: Tuple[int, int]) -> int:
+        """Get the single-bit mask for a position"""
+        return 1 << (pos[1] * self.width + pos[0])
+
+    def position_of(self, index: int) -> Tuple[int, int]:
+        """Convert a bit index back into a grid position"""
+        return (index % self.width, index // self.width)
+
+    def kind_at(self, pos: Tuple[int, int]) -> int:
+        """Get the kind of what occupies a cell, KIND_NONE if empty"""
+        return self.cells[pos[1] * self.width + pos[0]]
+
+    def set_kind(self, pos: Tuple[int, int], kind: int) -> int:
+        """Change the kind of a cell and return its previous kind"""
+        index = pos[1] * self.width + pos[0]
+        previous = self.cells[index]
+        if previous != kind:
+            self.cells[index] = kind
+            self._rocks = self._items = None
+        return previous
+
+    def is_rock(self, pos: Tuple[int, int]) -> bool:
+        return self.cells[pos[1] * self.width + pos[0]] == KIND_ROCK
+
+    def is_occupied(self, pos: Tuple[int, int]) -> bool:
+        """Check if any entity has the cell"""
+        return self.cells[pos[1] * self.width + pos[0]] != KIND_NONE
+
+    def _layer(self, kind: int) -> int:
+        digits = self.cells.translate(_LAYER_DIGITS[kind])
+        digits.reverse()  # Most significant digit first
+        return int(digits, 2)
+
+    @property
+    def rocks(self) -> int:
+        """Rock layer"""
+        if self._rocks is None:
+            self._rocks = self._layer(KIND_ROCK)
+        return self._rocks
+
+    @property
+    def items(self) -> int:
+        """Stick layer; sticks are the only item type"""
+        if self._items is None:
+            self._items = self._layer(KIND_STICK)
+        return self._items
+
+    def load_layers(self, rocks: int, items: int) -> None:
+        """Replace every cell with the rock and stick layers, in time linear in the board size"""
+        digits = bytearray(format(rocks, f'0{self.size}b').encode())
+        digits.reverse()
+        self.cells = digits.translate(_ROCK_CELLS)
+        for pos in self.positions(items):
+            self.cells[pos[1] * self.width + pos[0]] = KIND_STICK
+        self._rocks = rocks
+        self._items = items
+
+    @property
+    def open_mask(self) -> int:
+        """Interior cells that are not rocks"""
+        return self.interior_mask & ~self.rocks
+
+    def neighbors(self, mask: int) -> int:
+        """Get all cells orthogonally adjacent to any cell in the mask"""
+        return (((mask << 1) & self.not_left_column)
+                | ((mask >> 1) & self.not_right_column)
+                | ((mask << self.width) & self.full_mask)
+                | (mask >> self.width))
+
+    def flood_fill(self, seed: int, passable: int) -> int:
+        """Grow the seed through passable cells until it stops changing"""
+        filled = seed & passable
+        while True:
+            grown = (filled | self.neighbors(filled)) & passable
+            if grown == filled:
+                return filled
+            filled = grown
+
+    def positions(self, mask: int) -> Iterator[Tuple[int, int]]:
+        """Iterate over the positions of all set bits in a mask"""
+        data = mask.to_bytes((self.size + 7) // 8, 'little')
+        # Let the regex engine skip the runs of empty bytes
+        for match in _NONZERO_BYTE.finditer(data):
+            byte_index = match.start()
+            byte = data[byte_index]
+            while byte:
+                low = byte & -byte
+                yield self.position_of(byte_index * 8 + low.bit_length() - 1)
+                byte ^= low
+
+    @staticmethod
+    def count(mask: int) -> int:
+        """Count the number of set bits in a mask"""
+        return bin(mask).count('1')
@@ -0,0 +1,392 @@
+# world/chunked_world.py
+import random
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+from constants import (CHUNKED_WORLD_SIZE, CHUNK_SIZE, CHUNK_ROCK_COUNT,
+                       CHUNK_LOAD_RADIUS, CHUNK_EVICT_RADIUS, PATH_MAX_DISTANCE)
+from entities.base_entity import BaseEntity
+from entities.items import BaseItem, Stick
+from entities.obstacles import BaseObstacle, Rock
+from entities.kinds import KIND_NONE, KIND_ROCK
+from .bitboard import GridBoard
+from .connectivity import ConnectivityIndex
+from .spatial_index import SpatialIndex
+from .agent_layer import AgentLayer
+from .events import Change, ChangeStream
+from .distance_field import DistanceFieldCache
+from .update_scheduler import UpdateScheduler
+from stats import GameStats, apply_change
+
+class Chunk:
+    """Entities and rock connectivity for one square block of the world"""
+    def __init__(self, key: Tuple[int, int], size: int, world_width: int, world_height: int):
+        self.key = key
+        self.x = key[0] * size
+        self.y = key[1] * size
+        self.size = size
+        self.width = min(size, world_width - self.x)
+        self.height = min(size, world_height - self.y)
+        self.entities: Dict[Tuple[int, int], BaseEntity] = {}
+        # Occupancy in chunk-local coordinates; world border cells are
+        # always rock, so only the rest can be open
+        self.board = GridBoard(self.width, self.height)
+        self.connectivity = ConnectivityIndex(
+            self.board, max(self.x, 1) - self.x, max(self.y, 1) - self.y,
+            min(self.x + self.width, world_width - 1) - 1 - self.x,
+            min(self.y + self.height, world_height - 1) - 1 - self.y)
+
+    def local(self, pos: Tuple[int, int]) -> Tuple[int, int]:
+        return (pos[0] - self.x, pos[1] - self.y)
+
+    def set_kind(self, pos: Tuple[int, int], kind: int) -> None:
+        """Update the chunk board and rock connectivity for a cell"""
+        local = self.local(pos)
+        previous = self.board.set_kind(local, kind)
+        if kind == KIND_ROCK and previous != KIND_ROCK:
+            self.connectivity.add_rock(local)
+        elif previous == KIND_ROCK and kind != KIND_ROCK:
+            self.connectivity.remove_rock(local)
+
+    def can_place_rock(self, pos: Tuple[int, int]) -> bool:
+        """Check if a rock at pos keeps the chunk's open cells connected"""
+        return self.connectivity.can_place_rock(self.local(pos))
+
+    def positions(self) -> Iterator[Tuple[int, int]]:
+        """Iterate over every cell in the chunk"""
+        for y in range(self.y, self.y + self.height):
+            for x in range(self.x, self.x + self.width):
+                yield (x, y)
+
+    def is_inner(self, pos: Tuple[int, int]) -> bool:
+        """Check if a cell is off the chunk's edge ring, where rocks may go"""
+        return (self.x < pos[0] < self.x + self.width - 1
+                and self.y < pos[1] < self.y + self.height - 1)
+
+    def local_index(self, pos: Tuple[int, int]) -> int:
+        return (pos[1] - self.y) * self.size + (pos[0] - self.x)
+
+    def position_of(self, index: int) -> Tuple[int, int]:
+        return (self.x + index % self.size, self.y + index // self.size)
+
+def generate_packed_chunk(seed: int, key: Tuple[int, int], size: int = CHUNKED_WORLD_SIZE,
+                          chunk_size: int = CHUNK_SIZE) -> Tuple[bytes, bytes, int]:
+    """
+    Generate one chunk on its own, e.g. in a worker process.
+    Chunks only depend on the world seed and their key, so the result is
+    the same packed form the world would produce lazily, plus the number
+    of interior rocks placed.
+    """
+    stats = GameStats()
+    world = ChunkedWorld(stats, size, chunk_size, seed)
+    rock_bytes, item_bytes = world._pack_chunk(world._load_chunk(key))
+    return rock_bytes, item_bytes, stats.rocks_spawned
+
+class ChunkedWorld:
+    """
+    Huge map split into CHUNK_SIZE chunks. Chunks are generated the first
+    time they are touched or the camera comes within CHUNK_LOAD_RADIUS,
+    and packed into a rock bitmask plus item indices once the camera is
+    more than CHUNK_EVICT_RADIUS chunks away.
+
+    Rocks are only placed off each chunk's edge ring and every chunk keeps
+    its own open cells connected. The open edge rings of neighboring chunks
+    touch, so accessibility holds across chunk borders without ever looking
+    at more than one chunk.
+    """
+    def __init__(self, stats: GameStats, size: int = CHUNKED_WORLD_SIZE,
+                 chunk_size: int = CHUNK_SIZE, seed: Optional[int] = None):
+        self.width = size
+        self.height = size
+        self.chunk_size = chunk_size
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self.rng = random.Random(self.seed)
+        self.chunks: Dict[Tuple[int, int], Chunk] = {}
+        self._packed: Dict[Tuple[int, int], Tuple[bytes, bytes]] = {}
+        self.item_index = SpatialIndex(chunk_size)
+        # Path queries only read loaded chunks; see _is_blocking_loaded
+        self.distance_fields = DistanceFieldCache(self, PATH_MAX_DISTANCE, is_blocking=self._is_blocking_loaded)
+        self.scheduler = UpdateScheduler()
+        self.agents = AgentLayer(self)
+        self.version = 0  # Bumped on every entity change, for redraw tracking
+        # Stats follow the world through its change events
+        self.events = ChangeStream()
+        self.events.subscribe(apply_change, batched=False)
+
+        # Counters grow as chunks are generated
+        self.stats = stats
+        stats.rocks_spawned = 0
+        stats.empty_cells = (size - 2) * (size - 2)
+
+    @property
+    def obstacles(self) -> List[BaseObstacle]:
+        """Obstacles in the loaded chunks"""
+        return [entity for chunk in self.chunks.values()
+                for entity in chunk.entities.values() if isinstance(entity, BaseObstacle)]
+
+    @property
+    def items(self) -> List[BaseItem]:
+        """Items in the loaded chunks"""
+        return [entity for chunk in self.chunks.values()
+                for entity in chunk.entities.values() if isinstance(entity, BaseItem)]
+
+    def _is_border(self, pos: Tuple[int, int]) -> bool:
+        x, y = pos
+        return x == 0 or y == 0 or x == self.width - 1 or y == self.height - 1
+
+    def _chunk_key(self, pos: Tuple[int, int]) -> Tuple[int, int]:
+        return (pos[0] // self.chunk_size, pos[1] // self.chunk_size)
+
+    def _get_chunk(self, pos: Tuple[int, int]) -> Optional[Chunk]:
+        """Get the chunk containing a position, loading it if needed"""
+        if not (0 <= pos[0] < self.width and 0 <= pos[1] < self.height):
+            return None
+        key = self._chunk_key(pos)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self._load_chunk(key)
+        return chunk
+
+    def _load_chunk(self, key: Tuple[int, int]) -> Chunk:
+        chunk = Chunk(key, self.chunk_size, self.width, self.height)
+        self.chunks[key] = chunk
+        packed = self._packed.pop(key, None)
+        if packed is None:
+            self._generate_chunk(chunk)
+        else:
+            self._unpack_chunk(chunk, packed)
+        # Cached paths treated the chunk as blocked
+        self.distance_fields.clear()
+        return chunk
+
+    def _generate_chunk(self, chunk: Chunk) -> None:
+        """Fill a new chunk with border rocks, interior rocks and a stick"""
+        rng = random.Random(f"{self.seed}:{chunk.key[0]}:{chunk.key[1]}")
+        for pos in chunk.positions():
+            if self._is_border(pos):
+                self._place(chunk, Rock(*pos))
+
+        inner = [pos for pos in chunk.positions() if chunk.is_inner(pos)]
+        rng.shuffle(inner)
+        rocks_placed = 0
+        for pos in inner:
+            if rocks_placed == CHUNK_ROCK_COUNT:
+                break
+            if chunk.can_place_rock(pos):
+                self._place(chunk, Rock(*pos))
+                self.stats.rock_spawned()
+                rocks_placed += 1
+
+        pos = self._get_free_position(chunk, rng)
+        if pos:
+            self._place(chunk, Stick(*pos))
+
+    def _unpack_chunk(self, chunk: Chunk, packed: Tuple[bytes, bytes]) -> None:
+        """Rebuild a chunk's entities from its compact form"""
+        rock_bytes, item_bytes = packed
+        rocks = int.from_bytes(rock_bytes, 'little')
+        while rocks:
+            low = rocks & -rocks
+            self._place(chunk, Rock(*chunk.position_of(low.bit_length() - 1)))
+            rocks ^= low
+        # Sticks are the only item type
+        indices = array('I')
+        indices.frombytes(item_bytes)
+        for index in indices:
+            self._place(chunk, Stick(*chunk.position_of(index)))
+
+    def _pack_chunk(self, chunk: Chunk) -> Tuple[bytes, bytes]:
+        """Encode a chunk as a rock bitmask and item indices"""
+        rocks = 0
+        items = array('I')
+        for pos, entity in chunk.entities.items():
+            if isinstance(entity, BaseObstacle):
+                rocks |= 1 << chunk.local_index(pos)
+            else:
+                items.append(chunk.local_index(pos))
+        return (rocks.to_bytes(self.packed_rock_bytes, 'little'), items.tobytes())
+
+    @property
+    def packed_rock_bytes(self) -> int:
+        """Size of a chunk's packed rock bitmask"""
+        return (self.chunk_size * self.chunk_size + 7) // 8
+
+    def packed_chunks(self) -> Iterator[Tuple[Tuple[int, int], Tuple[bytes, bytes]]]:
+        """Iterate over the compact form of every generated chunk, loaded or not"""
+        yield from self._packed.items()
+        for key, chunk in self.chunks.items():
+            yield key, self._pack_chunk(chunk)
+
+    def load_packed_chunks(self, packed: Dict[Tuple[int, int], Tuple[bytes, bytes]]) -> None:
+        """Adopt chunks in compact form; they are unpacked when first touched"""
+        self._packed.update(packed)
+
+    def _evict_chunk(self, key: Tuple[int, int]) -> None:
+        """Pack a chunk into a rock bitmask and item indices and drop its entities"""
+        chunk = self.chunks.pop(key)
+        self._packed[key] = self._pack_chunk(chunk)
+        for pos, entity in chunk.entities.items():
+            self.scheduler.unschedule(entity)
+            if isinstance(entity, BaseItem):
+                self.item_index.remove(pos)
+        self.distance_fields.clear()
+
+    def update_focus(self, position: Tuple[int, int]) -> None:
+        """Load chunks around the camera position and pack the far away ones"""
+        center_x, center_y = self._chunk_key(position)
+        for key_y in range(center_y - CHUNK_LOAD_RADIUS, center_y + CHUNK_LOAD_RADIUS + 1):
+            for key_x in range(center_x - CHUNK_LOAD_RADIUS, center_x + CHUNK_LOAD_RADIUS + 1):
+                if (key_x, key_y) not in self.chunks:
+                    self._get_chunk((key_x * self.chunk_size, key_y * self.chunk_size))
+
+        for key in [key for key in self.chunks
+                    if max(abs(key[0] - center_x), abs(key[1] - center_y)) > CHUNK_EVICT_RADIUS]:
+            self._evict_chunk(key)
+
+    def _place(self, chunk: Chunk, entity: BaseEntity) -> None:
+        chunk.entities[entity.position] = entity
+        self.version += 1
+        chunk.set_kind(entity.position, entity.kind)
+        if entity.update_interval is not None:
+            self.scheduler.schedule(entity)
+        if isinstance(entity, BaseItem):
+            self.item_index.add(entity)
+
+    def add_to_grid(self, entity: BaseEntity) -> None:
+        """Add an entity to the grid"""
+        chunk = self._get_chunk(entity.position)
+        self._place(chunk, entity)
+        self.distance_fields.cell_changed(entity.position)
+        self.events.emit(Change.ENTITY_ADDED, entity.position, entity.kind)
+
+    def remove_from_grid(self, position: Tuple[int, int]) -> None:
+        """Remove an entity from the grid"""
+        chunk = self._get_chunk(position)
+        entity = chunk.entities.pop(position, None) if chunk else None
+        if entity is not None:
+            chunk.set_kind(position, KIND_NONE)
+            self.version += 1
+            self.scheduler.unschedule(entity)
+            self.distance_fields.cell_changed(position)
+            self.events.emit(Change.ENTITY_REMOVED, position, entity.kind)
+        if isinstance(entity, BaseItem):
+            self.item_index.remove(position)
+
+    def get_entity_at(self, position: Tuple[int, int]) -> Optional[BaseEntity]:
+        """Get entity at a specific position"""
+        chunk = self._get_chunk(position)
+        return chunk.entities.get(position) if chunk else None
+
+    def in_bounds(self, position: Tuple[int, int]) -> bool:
+        return 0 <= position[0] < self.width and 0 <= position[1] < self.height
+
+    def is_blocking(self, position: Tuple[int, int]) -> bool:
+        """Check if the entity at a position blocks movement"""
+        entity = self.get_entity_at(position)
+        return entity is not None and entity.is_blocking
+
+    def _is_blocking_loaded(self, position: Tuple[int, int]) -> bool:
+        """
+        is_blocking for path queries: cells of chunks that are not loaded
+        count as blocked, so a query never generates chunks, which would
+        change the stats and the state a replay or snapshot has to match.
+        """
+        chunk = self.chunks.get(self._chunk_key(position))
+        if chunk is None:
+            return True
+        entity = chunk.entities.get(position)
+        return entity is not None and entity.is_blocking
+
+    def get_kind(self, position: Tuple[int, int]) -> int:
+        """Get the kind of the entity at a position (see entities.kinds)"""
+        entity = self.get_entity_at(position)
+        return entity.kind if entity is not None else KIND_NONE
+
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """Get the cells of a shortest walk from start to goal within PATH_MAX_DISTANCE steps, through loaded chunks"""
+        if not self.in_bounds(goal):
+            return None
+        return self.distance_fields.find_path(start, goal)
+
+    def find_nearest_stick(self, start: Tuple[int, int]) -> Optional[Tuple[Tuple[int, int], List[Tuple[int, int]]]]:
+        """Get the stick within PATH_MAX_DISTANCE steps with the shortest walk from start, through loaded chunks"""
+        x, y = start
+        radius = PATH_MAX_DISTANCE
+        items = self.get_items_in_rect(x - radius, y - radius, x + radius, y + radius)
+        return self.distance_fields.find_nearest(start, [item.position for item in items])
+
+    def is_rock(self, position: Tuple[int, int]) -> bool:
+        """Check if there is a rock at a specific position"""
+        return isinstance(self.get_entity_at(position), BaseObstacle)
+
+    def get_items_in_rect(self, min_x: int, min_y: int, max_x: int, max_y: int) -> List[BaseItem]:
+        """Get loaded items inside an inclusive cell rectangle"""
+        return list(self.item_index.query(min_x, min_y, max_x, max_y))
+
+    def _get_free_position(self, chunk: Chunk, rng: random.Random,
+                           player_pos: Optional[Tuple[int, int]] = None) -> Optional[Tuple[int, int]]:
+        """Get a random cell in the chunk that is not a border, an entity, an agent or the player"""
+        free = [pos for pos in chunk.positions()
+                if pos not in chunk.entities and pos != player_pos and not self._is_border(pos)
+                and pos not in self.agents]
+        return rng.choice(free) if free else None
+
+    def spawn_new_rock(self, player_pos: Tuple[int, int], stats: GameStats) -> bool:
+        """
+        Try to spawn a new rock in the chunk around player_pos, avoiding
+        the player position and keeping the chunk connected.
+        """
+        chunk = self._get_chunk(player_pos)
+        candidates = [pos for pos in chunk.positions()
+                      if chunk.is_inner(pos) and pos != player_pos and pos not in chunk.entities
+                      and pos not in self.agents]
+        self.rng.shuffle(candidates)
+        for pos in candidates:
+            if chunk.can_place_rock(pos):
+                rock = Rock(*pos)
+                self.add_to_grid(rock)
+                self.events.emit(Change.ROCK_SPAWNED, pos, rock.kind, stats)
+                return True
+        return False
+
+    def spawn_new_stick(self, near: Optional[Tuple[int, int]] = None) -> None:
+        """Spawn a new stick in the chunk around near, or in a random loaded chunk"""
+        if near is not None:
+            chunk = self._get_chunk(near)
+        elif self.chunks:
+            chunk = self.rng.choice(list(self.chunks.values()))
+        else:
+            return
+        pos = self._get_free_position(chunk, self.rng)
+        if pos:
+            self.add_to_grid(Stick(*pos))
+
+    def try_remove_rock(self, position: Tuple[int, int], stats: GameStats) -> bool:
+        """
+        Try to remove a rock by spending a stick point.
+        Returns True if rock was removed, False otherwise.
+        """
+        entity = self.get_entity_at(position)
+        if isinstance(entity, Rock) and stats.sticks_collected > 0:
+            # Don't allow removing border rocks
+            if self._is_border(position):
+                return False
+            self.remove_from_grid(position)
+            self.events.emit(Change.ROCK_REMOVED, position, entity.kind, stats)
+            return True
+        return False
+
+    def check_collection(self, position: Tuple[int, int], stats: GameStats) -> None:
+        """Check if there's an item to collect"""
+        entity = self.get_entity_at(position)
+        if isinstance(entity, BaseItem) and entity.is_collectible:
+            entity.on_collect()
+            self.remove_from_grid(position)
+            if isinstance(entity, Stick):
+                self.events.emit(Change.STICK_COLLECTED, position, entity.kind, stats)
+                self.spawn_new_rock(position, stats)
+                self.spawn_new_stick(position)
+
+    def update(self, dt: float) -> None:
+        """Update the due entities in the loaded chunks, then deliver this tick's changes; evicted chunks are never ticked"""
+        self.scheduler.update(dt)
+        self.events.flush()
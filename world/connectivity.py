@@ -0,0 +1,203 @@
+# world/connectivity.py
+from array import array
+from typing import Set, Tuple
+from entities.kinds import KIND_ROCK
+from .bitboard import GridBoard
+
+# 8-neighborhood in ring order, starting north and going clockwise
+_RING = ((0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1))
+# bytes.translate table marking every cell but rocks as passable
+_PASSABLE = bytes(0 if kind == KIND_ROCK else 1 for kind in range(256))
+
+class ConnectivityIndex:
+    """
+    Articulation-point index over the open (non-rock) cells of a board
+    rectangle. Answers "would a rock here disconnect the map?" in O(1).
+
+    Occupancy is read straight from the board; its owner reports every rock
+    added to or removed from the rectangle after updating the board.
+    Rock changes are recorded in O(1); the cut-vertex set is rebuilt with a
+    single linear Tarjan pass the first time it is queried afterwards, so a
+    spawn costs one O(cells) pass instead of one flood fill per candidate.
+    While the map is known to be connected, cells whose neighbors stay
+    linked around them are answered from their 3x3 neighborhood alone and
+    never trigger a rebuild. Cut vertices are kept as one bit per cell.
+    """
+    def __init__(self, board: GridBoard, min_x: int, min_y: int, max_x: int, max_y: int):
+        self.board = board
+        self.min_x = min_x
+        self.min_y = min_y
+        self.max_x = max_x
+        self.max_y = max_y
+        self._open_count = 0
+        for y in range(min_y, max_y + 1):
+            start = y * board.width + min_x
+            self._open_count += max_x - min_x + 1 - board.cells.count(KIND_ROCK, start, start + max_x - min_x + 1)
+        self._cut_vertices = bytearray()  # Bit per board cell
+        self._isolated: Set[int] = set()  # Board cell indices
+        self._components = 0
+        self._dirty = True
+        # True/False once known, None when it needs a rebuild to find out.
+        # A rectangle without rocks, such as the inside of a freshly
+        # bordered board, is connected from the start
+        area = (max_x - min_x + 1) * (max_y - min_y + 1)
+        self._connected = True if self._open_count == area > 0 else None
+
+    def _contains(self, x: int, y: int) -> bool:
+        return self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y
+
+    def add_rock(self, pos: Tuple[int, int]) -> None:
+        """Record a rock placed on an open cell"""
+        if self._contains(*pos):
+            if self._connected and not self.is_locally_safe(pos):
+                self._connected = None
+            self._open_count -= 1
+            self._dirty = True
+
+    def remove_rock(self, pos: Tuple[int, int]) -> None:
+        """Record a rock removed from a cell, leaving it open"""
+        if self._contains(*pos):
+            x, y = pos
+            if self._connected and not any(self._is_open(x + dx, y + dy) for dx, dy in _RING[::2]):
+                self._connected = None
+            self._open_count += 1
+            self._dirty = True
+
+    def _is_open(self, x: int, y: int) -> bool:
+        return self._contains(x, y) and self.board.cells[y * self.board.width + x] != KIND_ROCK
+
+    def is_open(self, pos: Tuple[int, int]) -> bool:
+        """Check if a cell is inside the rectangle and not a rock"""
+        return self._is_open(*pos)
+
+    def is_connected(self) -> bool:
+        """Check if every open cell of the rectangle is reachable from every other"""
+        if self._connected is None:
+            self._rebuild()
+        return self._connected
+
+    def can_place_rock(self, pos: Tuple[int, int]) -> bool:
+        """
+        Check if a rock at pos keeps every open cell reachable.
+        Equivalent to PathFinder.is_map_accessible(rocks, pos).
+        """
+        if not self._is_open(*pos) or self._open_count == 1:
+            return False
+        if self._connected and self.is_locally_safe(pos):
+            return True
+        if self._dirty:
+            self._rebuild()
+        index = pos[1] * self.board.width + pos[0]
+        if self._components == 1:
+            return not self._cut_vertices[index >> 3] >> (index & 7) & 1
+        # A disconnected map only becomes connected again by filling in
+        # the single cell cut off from the rest
+        return self._components == 2 and index in self._isolated
+
+    def is_locally_safe(self, pos: Tuple[int, int]) -> bool:
+        """
+        Check if the open orthogonal neighbors of pos are all linked through
+        its 8-neighborhood, so a rock at pos cannot cut any of them off.
+        On a connected map such a rock keeps it connected, without a rebuild.
+        """
+        x, y = pos
+        ring = [self._is_open(x + dx, y + dy) for dx, dy in _RING]
+        if all(ring):
+            return True
+
+        # Walk the ring once starting after a closed cell and count the runs
+        # of open cells that touch an orthogonal neighbor (even indices)
+        start = ring.index(False)
+        linked_runs = 0
+        run_has_neighbor = False
+        for step in range(1, 9):
+            index = (start + step) % 8
+            if ring[index]:
+                run_has_neighbor = run_has_neighbor or index % 2 == 0
+            else:
+                linked_runs += run_has_neighbor
+                run_has_neighbor = False
+        return linked_runs == 1
+
+    def _rebuild(self) -> None:
+        """Recompute cut vertices with an iterative Tarjan DFS"""
+        board = self.board
+        width = self.max_x - self.min_x + 1
+        height = self.max_y - self.min_y + 1
+        # Passable cells of the rectangle with a closed margin around it, so
+        # neighbors are plain index offsets that never wrap or run off
+        stride = width + 2
+        passable = bytearray(stride * (height + 2))
+        for y in range(height):
+            start = (self.min_y + y) * board.width + self.min_x
+            passable[(y + 1) * stride + 1:(y + 1) * stride + 1 + width] = \
+                board.cells[start:start + width].translate(_PASSABLE)
+
+        offsets = (1, -1, stride, -stride)
+        discovery = array('i', [-1]) * len(passable)
+        low = array('i', [0]) * len(passable)
+        cut_vertices = []
+        isolated = []
+        components = 0
+        counter = 0
+
+        root = passable.find(1)
+        while root >= 0:
+            if discovery[root] < 0:
+                components += 1
+                discovery[root] = low[root] = counter
+                counter += 1
+                root_children = 0
+                nodes = [root]
+                parents = [-1]
+                steps = [0]
+
+                while nodes:
+                    node = nodes[-1]
+                    step = steps[-1]
+                    if step < 4:
+                        steps[-1] = step + 1
+                        neighbor = node + offsets[step]
+                        if not passable[neighbor] or neighbor == parents[-1]:
+                            continue
+                        if discovery[neighbor] >= 0:
+                            if discovery[neighbor] < low[node]:
+                                low[node] = discovery[neighbor]
+                        else:
+                            discovery[neighbor] = low[neighbor] = counter
+                            counter += 1
+                            if node == root:
+                                root_children += 1
+                            nodes.append(neighbor)
+                            parents.append(node)
+                            steps.append(0)
+                        continue
+
+                    nodes.pop()
+                    steps.pop()
+                    parent = parents.pop()
+                    if parent >= 0:
+                        if low[node] < low[parent]:
+                            low[parent] = low[node]
+                        if parent != root and low[node] >= discovery[parent]:
+                            cut_vertices.append(parent)
+
+                if root_children > 1:
+                    cut_vertices.append(root)
+                elif root_children == 0:
+                    isolated.append(root)
+            root = passable.find(1, root + 1)
+
+        def board_index(padded: int) -> int:
+            y, x = divmod(padded, stride)
+            return (self.min_y + y - 1) * board.width + self.min_x + x - 1
+
+        bits = bytearray((board.size + 7) // 8)
+        for padded in cut_vertices:
+            index = board_index(padded)
+            bits[index >> 3] |= 1 << (index & 7)
+        self._cut_vertices = bits
+        self._isolated = {board_index(padded) for padded in isolated}
+        self._components = components
+        self._connected = components == 1
+        self._dirty = False
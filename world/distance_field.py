@@ -0,0 +1,153 @@
+# world/distance_field.py
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from constants import DISTANCE_FIELD_CACHE_SIZE
+
+# Neighbor order also breaks ties between equally short paths
+_STEPS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+def _breadth_first(world, source: Tuple[int, int], max_distance: Optional[int] = None,
+                   targets: Optional[Set[Tuple[int, int]]] = None,
+                   is_blocking: Optional[Callable[[Tuple[int, int]], bool]] = None
+                   ) -> Tuple[Dict[Tuple[int, int], int], Optional[Tuple[int, int]]]:
+    """
+    Step counts from source over walkable cells, as judged by is_blocking
+    (the world's by default). With targets, the search stops at the first
+    target it touches and returns it as well.
+    """
+    if is_blocking is None:
+        is_blocking = world.is_blocking
+    distances = {source: 0}
+    frontier = deque([source])
+    while frontier:
+        pos = frontier.popleft()
+        distance = distances[pos] + 1
+        if max_distance is not None and distance > max_distance:
+            continue
+        x, y = pos
+        for dx, dy in _STEPS:
+            neighbor = (x + dx, y + dy)
+            if neighbor in distances:
+                continue
+            if targets is not None and neighbor in targets:
+                return distances, neighbor
+            if world.in_bounds(neighbor) and not is_blocking(neighbor):
+                distances[neighbor] = distance
+                frontier.append(neighbor)
+    return distances, None
+
+class DistanceField:
+    """
+    Breadth-first step counts from a source cell to every walkable cell
+    within max_distance steps. The source itself may be blocking (a stick
+    or a rock): paths then end by stepping into it, which turns the player
+    to face it.
+    """
+    def __init__(self, world, source: Tuple[int, int], max_distance: Optional[int] = None,
+                 is_blocking: Optional[Callable[[Tuple[int, int]], bool]] = None):
+        self.source = source
+        self.max_distance = max_distance
+        self.distances, _ = _breadth_first(world, source, max_distance, is_blocking=is_blocking)
+
+    def distance_to(self, pos: Tuple[int, int]) -> Optional[int]:
+        """Get the number of steps from pos to the source, None if unreachable"""
+        return self.distances.get(pos)
+
+    def path_from(self, start: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """Get the cells of a shortest walk from start to the source, excluding start"""
+        distance = self.distances.get(start)
+        x, y = start
+        if distance is None:
+            # start itself may be blocked, e.g. by a stick spawned under the player
+            reached = [self.distances[(x + dx, y + dy)] for dx, dy in _STEPS
+                       if (x + dx, y + dy) in self.distances]
+            if not reached:
+                return None
+            distance = min(reached) + 1
+        path = []
+        while distance:
+            distance -= 1
+            for dx, dy in _STEPS:
+                if self.distances.get((x + dx, y + dy)) == distance:
+                    x, y = x + dx, y + dy
+                    break
+            path.append((x, y))
+        return path
+
+    def is_affected_by(self, pos: Tuple[int, int]) -> bool:
+        """
+        Check if blocking or freeing pos can change this field: either the
+        cell was reached, or it touches a reached cell it could extend from.
+        """
+        distances = self.distances
+        if pos in distances:
+            return True
+        x, y = pos
+        return any((x + dx, y + dy) in distances for dx, dy in _STEPS)
+
+class DistanceFieldCache:
+    """
+    LRU cache of distance fields keyed by source cell.
+    Paths are looked up in the field of their goal, so a walking player
+    keeps hitting the same field. When a cell changes between blocking and
+    walkable, only the fields whose explored region touches it are dropped.
+    Searches read cells through is_blocking, the world's by default.
+    """
+    def __init__(self, world, max_distance: Optional[int] = None,
+                 size: int = DISTANCE_FIELD_CACHE_SIZE,
+                 is_blocking: Optional[Callable[[Tuple[int, int]], bool]] = None):
+        self.world = world
+        self.max_distance = max_distance
+        self.is_blocking = is_blocking
+        self.cache_size = size
+        self._fields: "OrderedDict[Tuple[int, int], DistanceField]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, source: Tuple[int, int]) -> DistanceField:
+        """Get the distance field of a source cell, computing it on a miss"""
+        field = self._fields.get(source)
+        if field is not None:
+            self.hits += 1
+            self._fields.move_to_end(source)
+            return field
+
+        self.misses += 1
+        field = DistanceField(self.world, source, self.max_distance, self.is_blocking)
+        if len(self._fields) >= self.cache_size:
+            self._fields.popitem(last=False)
+        self._fields[source] = field
+        return field
+
+    def cell_changed(self, pos: Tuple[int, int]) -> None:
+        """Drop the fields affected by a cell becoming blocking or walkable"""
+        stale = [source for source, field in self._fields.items() if field.is_affected_by(pos)]
+        for source in stale:
+            del self._fields[source]
+        self.invalidations += len(stale)
+
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """Get a shortest path from start to goal, excluding start"""
+        return self.get(goal).path_from(start)
+
+    def find_nearest(self, start: Tuple[int, int],
+                     targets: Iterable[Tuple[int, int]]) -> Optional[Tuple[Tuple[int, int], List[Tuple[int, int]]]]:
+        """
+        Get the target with the shortest walk from start and the path to it.
+        One search grows from start until it touches a target; the path then
+        comes from that target's field, which stays cached while walking
+        there. A target under start itself is skipped since it cannot be faced.
+        """
+        targets = set(targets)
+        targets.discard(start)
+        if not targets:
+            return None
+        _, nearest = _breadth_first(self.world, start, self.max_distance, targets, self.is_blocking)
+        if nearest is None:
+            return None
+        return nearest, self.find_path(start, nearest)
+
+    def clear(self) -> None:
+        self._fields.clear()
@@ -0,0 +1,62 @@
+# world/events.py
+from enum import IntEnum
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+class Change(IntEnum):
+    ENTITY_ADDED = 0
+    ENTITY_REMOVED = 1
+    STICK_COLLECTED = 2  # Collected by the owner of stats
+    ROCK_SPAWNED = 3  # Placed after a collection, counted for the owner of stats
+    ROCK_REMOVED = 4  # Removed by the owner of stats, spending a stick
+
+class ChangeEvent(NamedTuple):
+    change: Change
+    position: Tuple[int, int]
+    kind: int  # Entity kind at the position (see entities.kinds)
+    stats: Optional[object] = None  # GameStats of whoever caused a game action
+
+class ChangeStream:
+    """
+    Typed stream of the changes made to a world.
+    Immediate listeners see every event as it is emitted, for state that
+    must never lag behind the world, such as stats. Batched listeners get
+    the events emitted since the last flush() as one list, which worlds
+    deliver at the end of every tick, so a consumer such as a render cache
+    or network sync updates once per tick in proportion to what changed.
+    Nothing is built or buffered while there are no listeners.
+    """
+    def __init__(self):
+        self._immediate: List[Callable[[ChangeEvent], None]] = []
+        self._batched: List[Callable[[List[ChangeEvent]], None]] = []
+        self._pending: List[ChangeEvent] = []
+        self.active = False
+
+    def subscribe(self, listener: Callable, batched: bool = True) -> None:
+        """Call listener(events) on every flush, or listener(event) per event when not batched"""
+        (self._batched if batched else self._immediate).append(listener)
+        self.active = True
+
+    def unsubscribe(self, listener: Callable) -> None:
+        for listeners in (self._immediate, self._batched):
+            if listener in listeners:
+                listeners.remove(listener)
+        self.active = bool(self._immediate or self._batched)
+        if not self._batched:
+            self._pending.clear()
+
+    def emit(self, change: Change, position: Tuple[int, int], kind: int, stats: Optional[object] = None) -> None:
+        if not self.active:
+            return
+        event = ChangeEvent(change, position, kind, stats)
+        for listener in self._immediate:
+            listener(event)
+        if self._batched:
+            self._pending.append(event)
+
+    def flush(self) -> None:
+        """Deliver the pending events to the batched listeners"""
+        if not self._pending:
+            return
+        events, self._pending = self._pending, []
+        for listener in self._batched:
+            listener(events)
@@ -0,0 +1,156 @@
+# world/free_cells.py
+import random
+from array import array
+from typing import Iterator, Optional, Tuple
+from entities.kinds import KIND_NONE
+from .bitboard import GridBoard
+
+# Interior cells of a row covered by one counted block
+BLOCK_CELLS = 64
+
+class FreeCellIndex:
+    """
+    Free interior cells of a board, with uniform random sampling.
+    Each interior row is split into blocks of BLOCK_CELLS cells and a
+    Fenwick tree over the free count of every block finds the block holding
+    the k-th free cell, so add, remove and sample take O(log blocks) time
+    and the index costs a few bytes per block instead of anything per cell.
+    The counts are taken from the board on first use, so building or
+    resetting the index is free until something samples or counts it.
+    Cells are ranked by position, so a sample only depends on the board
+    and the RNG.
+    """
+    def __init__(self, board: GridBoard):
+        self.board = board
+        self._blocks_per_row = max(0, -(-(board.width - 2) // BLOCK_CELLS))
+        self._blocks = self._blocks_per_row * max(0, board.height - 2)
+        self._top_step = 1 << (self._blocks.bit_length() - 1) if self._blocks else 0
+        self._tree = array('I')
+        self._count = 0
+        self._dirty = True
+
+    def reset(self) -> None:
+        """Forget the counts after the board changed wholesale; they are recounted on next use"""
+        self._dirty = True
+
+    def _rebuild(self) -> None:
+        """Recount every block from the board, in one linear pass"""
+        board = self.board
+        cells = board.cells
+        blocks = self._blocks
+        # 1-based Fenwick tree over the block counts
+        tree = array('I', bytes(4 * (blocks + 1)))
+        total = 0
+        node = 1
+        for y in range(1, board.height - 1):
+            row_end = y * board.width + board.width - 1
+            for start in range(y * board.width + 1, row_end, BLOCK_CELLS):
+                free = cells.count(KIND_NONE, start, start + BLOCK_CELLS if start + BLOCK_CELLS < row_end else row_end)
+                total += free
+                tree[node] += free
+                parent = node + (node & -node)
+                if parent <= blocks:
+                    tree[parent] += tree[node]
+                node += 1
+        self._tree = tree
+        self._count = total
+        self._dirty = False
+
+    def __len__(self) -> int:
+        if self._dirty:
+            self._rebuild()
+        return self._count
+
+    def __contains__(self, pos: Tuple[int, int]) -> bool:
+        return self.board.is_interior(pos) and self.board.kind_at(pos) == KIND_NONE
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        """Iterate over the free cells in position order, reading the live board"""
+        board = self.board
+        width = board.width
+        for y in range(1, board.height - 1):
+            row = y * width
+            index = board.cells.find(KIND_NONE, row + 1, row + width - 1)
+            while index >= 0:
+                yield (index - row, y)
+                index = board.cells.find(KIND_NONE, index + 1, row + width - 1)
+
+    def _block_range(self, block: int) -> Tuple[int, int]:
+        """Cell index range [start, end) of a block"""
+        row, column_block = divmod(block, self._blocks_per_row)
+        row_start = (row + 1) * self.board.width
+        start = row_start + 1 + column_block * BLOCK_CELLS
+        return start, min(start + BLOCK_CELLS, row_start + self.board.width - 1)
+
+    def _block_of(self, pos: Tuple[int, int]) -> int:
+        return (pos[1] - 1) * self._blocks_per_row + (pos[0] - 1) // BLOCK_CELLS
+
+    def _update(self, block: int, delta: int) -> None:
+        if self._dirty:
+            # The recount reads the board as it is then
+            return
+        self._count += delta
+        node = block + 1
+        while node <= self._blocks:
+            self._tree[node] += delta
+            node += node & -node
+
+    def add(self, pos: Tuple[int, int]) -> None:
+        """Count a cell as free; call after clearing it on the board"""
+        if pos in self:
+            self._update(self._block_of(pos), 1)
+
+    def remove(self, pos: Tuple[int, int]) -> None:
+        """Count a cell as occupied; call before placing anything on it"""
+        if pos in self:
+            self._update(self._block_of(pos), -1)
+
+    def _rank(self, pos: Tuple[int, int]) -> int:
+        """Number of free cells before pos"""
+        block = self._block_of(pos)
+        rank = 0
+        node = block
+        while node:
+            rank += self._tree[node]
+            node &= node - 1
+        start, _ = self._block_range(block)
+        return rank + self.board.cells.count(KIND_NONE, start, self.board.index(pos))
+
+    def _select(self, rank: int) -> Tuple[int, int]:
+        """Get the free cell with the given rank"""
+        # Descend the tree to the block holding it
+        tree = self._tree
+        block = 0
+        step = self._top_step
+        while step:
+            node = block + step
+            if node <= self._blocks and tree[node] <= rank:
+                block = node
+                rank -= tree[node]
+            step >>= 1
+
+        cells = self.board.cells
+        start, end = self._block_range(block)
+        index = cells.find(KIND_NONE, start, end)
+        for _ in range(rank):
+            index = cells.find(KIND_NONE, index + 1, end)
+        return self.board.position_of(index)
+
+    def sample(self, rng=random, exclude: Optional[Tuple[int, int]] = None) -> Optional[Tuple[int, int]]:
+        """
+        Pick a uniformly random free cell, never returning exclude.
+        rng is anything with randrange, e.g. the random module or random.Random.
+        Returns None only if there is no free cell left.
+        """
+        count = len(self)
+        if exclude is not None and exclude in self:
+            if count == 1:
+                return None
+            # Skip over the excluded cell's rank
+            rank = rng.randrange(count - 1)
+            if rank >= self._rank(exclude):
+                rank += 1
+            return self._select(rank)
+        if count == 0:
+            return None
+        return self._select(rng.randrange(count))
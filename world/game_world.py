@@ -1,77 +1,245 @@
 import random
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 from constants import GRID_SIZE, ROCK_COUNT
 from entities.base_entity import BaseEntity
 from entities.items import BaseItem, Stick
 from entities.obstacles import BaseObstacle, Rock
+from entities.kinds import KIND_NONE, KIND_ROCK
 from .path_finder import PathFinder, PathFinderCache
-from stats import GameStats
+from .distance_field import DistanceFieldCache
+from .connectivity import ConnectivityIndex
+from .bitboard import GridBoard
+from .free_cells import FreeCellIndex
+from .spatial_index import SpatialIndex
+from .update_scheduler import UpdateScheduler
+from .agent_layer import AgentLayer
+from .events import Change, ChangeStream
+from stats import GameStats, apply_change
 
 class GameWorld:
-    def __init__(self, stats):
-        self.obstacles: List[BaseObstacle] = []
+    def __init__(self, stats, seed: Optional[int] = None, generate: bool = True,
+                 width: int = GRID_SIZE, height: int = GRID_SIZE, rock_count: int = ROCK_COUNT):
+        # Per-world RNG so a session can be reproduced from its seed
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self.rng = random.Random(self.seed)
         self.items: List[BaseItem] = []
         self.collected_items = 0
         self.path_cache = PathFinderCache()
+        # Entities by position, except plain rocks, which only live on the board
         self.grid: Dict[Tuple[int, int], BaseEntity] = {}
+        self.width = width
+        self.height = height
+        self.rock_count = rock_count  # Interior rocks placed at generation
+        # Source of truth for what occupies every cell
+        self.board = GridBoard(width, height)
+        self.connectivity = ConnectivityIndex(self.board, 1, 1, width - 2, height - 2)
+        self.free_cells = FreeCellIndex(self.board)
+        self.item_index = SpatialIndex()
+        self.distance_fields = DistanceFieldCache(self)
+        self.scheduler = UpdateScheduler()
+        self.agents = AgentLayer(self)
+        self.version = 0  # Bumped on every entity change, for redraw tracking
+        # Stats follow the world through its change events
+        self.events = ChangeStream()
+        self.events.subscribe(apply_change, batched=False)
         self.stats = stats
-        self._generate_rocks()
-        self.spawn_new_stick()
+        if generate:
+            stats.empty_cells = (width - 2) * (height - 2)
+            self._generate_rocks()
+            self.spawn_new_stick()
+
+    @property
+    def obstacles(self) -> Iterator[BaseObstacle]:
+        """
+        Iterate over every obstacle. Plain rocks only exist on the board and
+        come as views made on the fly, so bulk work should read board.rocks.
+        """
+        for pos in self.board.positions(self.board.rocks):
+            entity = self.grid.get(pos)
+            yield entity if entity is not None else Rock(*pos)
+
+    def load_layers(self, rocks: int, items: int) -> None:
+        """
+        Adopt rock and stick layers as bitboard masks, skipping every
+        generation check. Rocks stay on the board alone, so only the sticks
+        become entities.
+        """
+        board = self.board
+        board.load_layers(rocks, items)
+        self.connectivity = ConnectivityIndex(board, 1, 1, self.width - 2, self.height - 2)
+        self.free_cells.reset()
+        # Layout hashes are only compared within one world, so the loaded
+        # layout can start from hash 0 without toggling in every rock
+        self.path_cache.clear()
+        self.path_cache.rock_hash = 0
+        self.version += 1
+        for x, y in board.positions(items):
+            stick = Stick(x, y)
+            self.items.append(stick)
+            self.grid[stick.position] = stick
+            self.item_index.add(stick)
 
     def add_to_grid(self, entity: BaseEntity) -> None:
         """Add an entity to the grid"""
-        self.grid[entity.position] = entity
+        position = entity.position
+        self.free_cells.remove(position)
+        previous = self.board.set_kind(position, entity.kind)
+        if type(entity) is not Rock:
+            # Plain rocks carry no state or behavior, so the board is enough
+            self.grid[position] = entity
+        self.version += 1
+        self.distance_fields.cell_changed(position)
+        if entity.update_interval is not None:
+            self.scheduler.schedule(entity)
+        self.events.emit(Change.ENTITY_ADDED, position, entity.kind)
+        if entity.kind == KIND_ROCK and previous != KIND_ROCK:
+            self.connectivity.add_rock(position)
+            self.path_cache.toggle_rock(position)
+        elif isinstance(entity, BaseItem):
+            self.item_index.add(entity)
 
     def remove_from_grid(self, position: Tuple[int, int]) -> None:
         """Remove an entity from the grid"""
-        if position in self.grid:
-            del self.grid[position]
+        entity = self.get_entity_at(position)
+        if entity is None:
+            return
+        self.board.set_kind(position, KIND_NONE)
+        self.grid.pop(position, None)
+        self.version += 1
+        self.scheduler.unschedule(entity)
+        self.distance_fields.cell_changed(position)
+        self.free_cells.add(position)
+        self.events.emit(Change.ENTITY_REMOVED, position, entity.kind)
+        if entity.kind == KIND_ROCK:
+            self.connectivity.remove_rock(position)
+            self.path_cache.toggle_rock(position)
+        elif isinstance(entity, BaseItem):
+            self.item_index.remove(position)
 
     def get_entity_at(self, position: Tuple[int, int]) -> Optional[BaseEntity]:
-        """Get entity at a specific position"""
-        return self.grid.get(position)
+        """Get entity at a specific position; plain rocks come back as fresh views of the board"""
+        entity = self.grid.get(position)
+        if entity is None and self.is_rock(position):
+            return Rock(*position)
+        return entity
+
+    def get_items_in_rect(self, min_x: int, min_y: int, max_x: int, max_y: int) -> List[BaseItem]:
+        """Get items inside an inclusive cell rectangle"""
+        return list(self.item_index.query(min_x, min_y, max_x, max_y))
+
+    def in_bounds(self, position: Tuple[int, int]) -> bool:
+        return 0 <= position[0] < self.width and 0 <= position[1] < self.height
+
+    def is_blocking(self, position: Tuple[int, int]) -> bool:
+        """Check if the entity at a position blocks movement"""
+        if not self.in_bounds(position):
+            return False
+        entity = self.grid.get(position)
+        if entity is not None:
+            return entity.is_blocking
+        return self.board.is_rock(position)
+
+    def get_kind(self, position: Tuple[int, int]) -> int:
+        """Get the kind of the entity at a position (see entities.kinds)"""
+        return self.board.kind_at(position) if self.in_bounds(position) else KIND_NONE
+
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """Get the cells of a shortest walk from start to goal, excluding start"""
+        if not self.in_bounds(goal):
+            return None
+        return self.distance_fields.find_path(start, goal)
+
+    def find_nearest_stick(self, start: Tuple[int, int]) -> Optional[Tuple[Tuple[int, int], List[Tuple[int, int]]]]:
+        """Get the stick with the shortest walk from start and the path to it"""
+        return self.distance_fields.find_nearest(start, [item.position for item in self.items])
+
+    def is_rock(self, position: Tuple[int, int]) -> bool:
+        """Check if there is a rock at a specific position"""
+        return self.board.in_bounds(position) and self.board.is_rock(position)
 
     def _get_rock_positions(self) -> Set[Tuple[int, int]]:
         """Get set of current rock positions"""
-        return {(obstacle.x, obstacle.y) for obstacle in self.obstacles}
+        return set(self.board.positions(self.board.rocks))
 
     def _is_position_blocked(self, pos: Tuple[int, int], player_pos: Optional[Tuple[int, int]] = None) -> bool:
         """Check if a position is blocked by any entity or the player"""
-        return pos in self.grid or pos == player_pos
+        return self.board.is_occupied(pos) or pos == player_pos
 
     def get_valid_spawn_position(self, player_pos: Optional[Tuple[int, int]] = None) -> Optional[Tuple[int, int]]:
-        """Get a random position that's not occupied by any entity or the player"""
-        attempts = 100
-        while attempts > 0:
-            x = random.randint(1, GRID_SIZE-2)
-            y = random.randint(1, GRID_SIZE-2)
-            pos = (x, y)
-            if not self._is_position_blocked(pos, player_pos):
+        """
+        Get a random position that's not occupied by any entity, agent or the player.
+        Only returns None when every interior cell is taken.
+        """
+        pos = self.free_cells.sample(self.rng, player_pos)
+        if pos not in self.agents:
+            return pos
+        for _ in range(100):
+            pos = self.free_cells.sample(self.rng, player_pos)
+            if pos not in self.agents:
+                return pos
+        # Crowded board: look through every free cell
+        for pos in self.free_cells:
+            if pos != player_pos and pos not in self.agents:
+                return pos
+        return None
+
+    def is_map_accessible(self, test_pos: Optional[Tuple[int, int]] = None) -> bool:
+        """
+        Check if every open cell stays reachable with an extra rock at test_pos.
+        Results are memoized in path_cache against the current rock layout.
+        """
+        result = self.path_cache.get(test_pos)
+        if result is None:
+            if test_pos is None:
+                result = PathFinder.is_board_accessible(self.board)
+            else:
+                result = self.connectivity.can_place_rock(test_pos)
+            self.path_cache.set(test_pos, result)
+        return result
+
+    def _get_rock_spawn_position(self) -> Optional[Tuple[int, int]]:
+        """Get a random free position where a rock keeps the map accessible"""
+        # While the map is connected, cells that are safe from their 3x3
+        # neighborhood alone need no cut-vertex rebuild
+        if self.connectivity.is_connected():
+            for _ in range(100):
+                pos = self.get_valid_spawn_position()
+                if pos is None:
+                    return None
+                if self.connectivity.is_locally_safe(pos):
+                    return pos
+
+        for _ in range(100):
+            pos = self.get_valid_spawn_position()
+            if pos is None:
+                return None
+            if self.is_map_accessible(pos):
+                return pos
+
+        # Dense board: most free cells are cut vertices, so check them all
+        for pos in self.free_cells:
+            if self.is_map_accessible(pos):
                 return pos
-            attempts -= 1
         return None
 
     def _generate_rocks(self) -> None:
         """Generate initial rocks including borders"""
         # Generate border rocks
-        for x in range(GRID_SIZE):
-            for pos in [(x, 0), (x, GRID_SIZE-1), (0, x), (GRID_SIZE-1, x)]:
-                rock = Rock(pos[0], pos[1])
-                self.obstacles.append(rock)
-                self.add_to_grid(rock)
+        border = [(x, y) for x in range(self.width) for y in (0, self.height-1)]
+        border += [(x, y) for y in range(1, self.height-1) for x in (0, self.width-1)]
+        for pos in border:
+            self.add_to_grid(Rock(pos[0], pos[1]))
 
         # Generate interior rocks
         rocks_placed = 0
-        rock_positions = self._get_rock_positions()
 
-        while rocks_placed < ROCK_COUNT:
-            pos = self.get_valid_spawn_position()
-            if pos and PathFinder.is_map_accessible(rock_positions, pos):
-                x, y = pos
-                rock = Rock(x, y)
-                self.obstacles.append(rock)
-                self.add_to_grid(rock)
-                rocks_placed += 1
+        while rocks_placed < self.rock_count:
+            pos = self._get_rock_spawn_position()
+            if pos is None:  # No room left for another rock
+                break
+            x, y = pos
+            self.add_to_grid(Rock(x, y))
+            rocks_placed += 1
                 
         # Update stats with initial rocks
         if hasattr(self, 'stats'):  # In case stats hasn't been set yet
@@ -82,31 +250,36 @@ class GameWorld:
         Try to spawn a new rock avoiding the player position.
         Only rocks block accessibility, but we won't place on players or items.
         """
-        # Get current rock positions
-        rocks = self._get_rock_positions()
-        
-        # Get candidate positions (excluding player and items)
-        blocked_for_placement = {player_pos}  # Initial positions we can't place on
-        blocked_for_placement.update((item.x, item.y) for item in self.items)
-        
-        # Try all valid positions that aren't blocked for initial placement
-        candidates = PathFinder.VALID_POSITIONS - blocked_for_placement
-        
-        for pos in candidates:
-            # Skip if there's already a rock here
-            if pos in rocks:
-                continue
-                
+        pos = self._get_spawn_candidate(player_pos)
+        if pos is None:
+            return False
+        x, y = pos
+        rock = Rock(x, y)
+        self.add_to_grid(rock)
+        self.events.emit(Change.ROCK_SPAWNED, pos, rock.kind, stats)
+        return True
+
+    def _get_spawn_candidate(self, player_pos: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """
+        Get the cell spawn_new_rock fills, the same for the same board.
+        On a connected map that is the first free cell in row-major order
+        whose 3x3 neighborhood shows a rock there is safe, which needs no
+        cut-vertex rebuild; otherwise the first one that keeps the map
+        accessible at all.
+        """
+        def candidates():
+            # Free cells exclude rocks and items; skip the player and agents too
+            return (pos for pos in self.free_cells if pos != player_pos and pos not in self.agents)
+
+        if self.connectivity.is_connected():
+            for pos in candidates():
+                if self.connectivity.is_locally_safe(pos):
+                    return pos
+        for pos in candidates():
             # Check if placing a rock here maintains accessibility
-            if PathFinder.is_map_accessible(rocks, pos):
-                x, y = pos
-                rock = Rock(x, y)
-                self.obstacles.append(rock)
-                self.add_to_grid(rock)
-                stats.rock_spawned()
-                return True
-        
-        return False
+            if self.is_map_accessible(pos):
+                return pos
+        return None
 
     def spawn_new_stick(self) -> None:
         """Spawn a new stick in a valid position"""
@@ -126,16 +299,13 @@ class GameWorld:
         if isinstance(entity, Rock) and stats.sticks_collected > 0:
             # Don't allow removing border rocks
             x, y = position
-            if x == 0 or x == GRID_SIZE-1 or y == 0 or y == GRID_SIZE-1:
+            if x == 0 or x == self.width-1 or y == 0 or y == self.height-1:
                 return False
                 
-            # Remove the rock
-            self.obstacles.remove(entity)
+            # Remove the rock; spending the stick point and updating the
+            # empty cells count happen in the stats listener
             self.remove_from_grid(position)
-            # Spend a stick point
-            stats.spend_stick()
-            # Update empty cells count
-            stats.rock_removed()
+            self.events.emit(Change.ROCK_REMOVED, position, entity.kind, stats)
             return True
         return False
 
@@ -147,13 +317,15 @@ class GameWorld:
             self.items.remove(entity)
             self.remove_from_grid(position)
             if isinstance(entity, Stick):
-                stats.stick_collected()
+                self.events.emit(Change.STICK_COLLECTED, position, entity.kind, stats)
                 self.spawn_new_rock(position, stats)
                 self.spawn_new_stick()
 
+    def update_focus(self, position: Tuple[int, int]) -> None:
+        """Called with the camera position; the whole map is always loaded"""
+        pass
+
     def update(self, dt: float) -> None:
-        """Update all entities in the world"""
-        for obstacle in self.obstacles:
-            obstacle.update(dt)
-        for item in self.items:
-            item.update(dt)
\ No newline at end of file
+        """Update the entities that are due, then hand this tick's changes to the batched listeners"""
+        self.scheduler.update(dt)
+        self.events.flush()
\ No newline at end of file
@@ -1,121 +1,191 @@
 # world/path_finder.py
-from typing import Set, Tuple, List, FrozenSet
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple, List, FrozenSet
 from constants import GRID_SIZE
 from functools import lru_cache
+from .bitboard import GridBoard
+
+def _valid_positions(width: int, height: int) -> FrozenSet[Tuple[int, int]]:
+    return frozenset((x, y) for x in range(1, width-1) for y in range(1, height-1))
+
+def _neighbors_map(width: int, height: int) -> Dict[Tuple[int, int], Tuple[Tuple[int, int], ...]]:
+    return {pos: _interior_neighbors(pos, width, height) for pos in _valid_positions(width, height)}
+
+def _interior_neighbors(pos: Tuple[int, int], width: int, height: int) -> Tuple[Tuple[int, int], ...]:
+    x, y = pos
+    return tuple((nx, ny)
+                 for nx, ny in [(x+1, y), (x-1, y), (x, y+1), (x, y-1)]
+                 if 1 <= nx < width-1 and 1 <= ny < height-1)
+
+class _LazyTable:
+    """Class attribute for the default GRID_SIZE, built on first access instead of at import"""
+    def __init__(self, build):
+        self._build = build
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def __get__(self, instance, owner):
+        table = self._build(GRID_SIZE, GRID_SIZE)
+        # Replace the descriptor so later reads are plain attribute lookups
+        setattr(owner, self._name, table)
+        return table
 
 class PathFinder:
-    # Pre-calculate valid positions (not on border)
-    VALID_POSITIONS = frozenset((x, y) 
-                               for x in range(1, GRID_SIZE-1) 
-                               for y in range(1, GRID_SIZE-1))
-    
-    # Pre-calculate neighbors for each position
-    NEIGHBORS_MAP = {
-        (x, y): tuple((nx, ny) 
-                      for nx, ny in [(x+1, y), (x-1, y), (x, y+1), (x, y-1)]
-                      if 1 <= nx < GRID_SIZE-1 and 1 <= ny < GRID_SIZE-1)
-        for x, y in VALID_POSITIONS
-    }
+    # Valid positions (not on border) and the neighbors of each one for the
+    # default grid; other sizes go through valid_positions(width, height)
+    VALID_POSITIONS = _LazyTable(_valid_positions)
+    NEIGHBORS_MAP = _LazyTable(_neighbors_map)
 
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def valid_positions(width: int = GRID_SIZE, height: int = GRID_SIZE) -> FrozenSet[Tuple[int, int]]:
+        """Get every interior cell of a width x height grid"""
+        return _valid_positions(width, height)
 
-    @classmethod
-    def is_position_valid(cls, pos: Tuple[int, int]) -> bool:
+    @staticmethod
+    def is_position_valid(pos: Tuple[int, int], width: int = GRID_SIZE, height: int = GRID_SIZE) -> bool:
         """Check if a position is within bounds and not on the border"""
-        return pos in cls.VALID_POSITIONS
+        return 0 < pos[0] < width - 1 and 0 < pos[1] < height - 1
 
-    @classmethod
-    def get_neighbors(cls, pos: Tuple[int, int]) -> Tuple[Tuple[int, int], ...]:
+    @staticmethod
+    def get_neighbors(pos: Tuple[int, int], width: int = GRID_SIZE,
+                      height: int = GRID_SIZE) -> Tuple[Tuple[int, int], ...]:
         """Get all valid neighboring positions"""
-        return cls.NEIGHBORS_MAP.get(pos, ())
+        if not PathFinder.is_position_valid(pos, width, height):
+            return ()
+        return _interior_neighbors(pos, width, height)
     
     @classmethod
-    def find_all_accessible_positions(cls, rocks: Set[Tuple[int, int]], start_pos: Tuple[int, int]) -> Set[Tuple[int, int]]:
+    def find_all_accessible_positions(cls, rocks: Set[Tuple[int, int]], start_pos: Tuple[int, int],
+                                      width: int = GRID_SIZE, height: int = GRID_SIZE) -> Set[Tuple[int, int]]:
         """
         Find all positions that can be reached from the start position.
         Only rocks block movement in accessibility checking.
+        Floods a GridBoard built from the rocks; only the result is turned
+        back into positions.
         Args:
             rocks: Set of current rock positions
             start_pos: Starting position for the flood fill
+            width, height: Grid dimensions
         Returns:
             Set of all accessible positions
         """
-        visited = set()
-        to_visit = {start_pos}
-        
-        while to_visit:
-            current = to_visit.pop()
-            if current not in visited and current not in rocks:
-                visited.add(current)
-                # Add all unvisited neighbors
-                to_visit.update(
-                    neighbor for neighbor in cls.NEIGHBORS_MAP[current]
-                    if neighbor not in visited and neighbor not in rocks
-                )
-        
-        return visited
+        board = GridBoard.from_rocks(rocks, width, height)
+        if not board.in_bounds(start_pos):
+            return set()
+        return set(board.positions(cls.find_accessible_mask(board, start_pos)))
 
     @classmethod
-    def is_map_accessible(cls, rocks: Set[Tuple[int, int]], test_pos: Tuple[int, int] = None) -> bool:
+    def is_map_accessible(cls, rocks: Set[Tuple[int, int]], test_pos: Tuple[int, int] = None,
+                          width: int = GRID_SIZE, height: int = GRID_SIZE) -> bool:
         """
         Check if all non-rock positions remain accessible with the given rock configuration.
         Only rocks (and the test_pos) are considered as blocking for accessibility.
         """
-        # Quick validation for test_pos
-        if test_pos and (test_pos in rocks or test_pos not in cls.VALID_POSITIONS):
-            return False
+        return cls.is_board_accessible(GridBoard.from_rocks(rocks, width, height), test_pos)
 
-        # Create set of rocks including test position
-        rock_set = rocks | {test_pos} if test_pos else rocks
+    @staticmethod
+    def find_accessible_mask(board: GridBoard, start_pos: Tuple[int, int], blocked: int = 0) -> int:
+        """
+        Bitboard version of find_all_accessible_positions.
+        Returns a mask of every open cell reachable from start_pos,
+        treating board rocks and the extra blocked mask as walls.
+        """
+        passable = board.open_mask & ~blocked
+        return board.flood_fill(board.bit(start_pos), passable)
 
-        # Find a valid starting position that isn't a rock
-        start_pos = None
-        for pos in cls.VALID_POSITIONS:
-            if pos not in rock_set:
-                start_pos = pos
-                break
+    @staticmethod
+    def is_board_accessible(board: GridBoard, test_pos: Tuple[int, int] = None) -> bool:
+        """
+        Bitboard version of is_map_accessible.
+        Check if all open cells stay connected with an extra rock at test_pos.
+        """
+        open_cells = board.open_mask
+        if test_pos is not None:
+            if not board.in_bounds(test_pos):
+                return False
+            test_bit = board.bit(test_pos)
+            if not open_cells & test_bit:
+                return False
+            open_cells &= ~test_bit
 
-        if start_pos is None:  # No empty spaces
+        if not open_cells:  # No empty spaces
             return False
 
-        # Get all accessible positions from this starting point
-        accessible = cls.find_all_accessible_positions(rock_set, start_pos)
-        
-        # Compare with total available positions
-        all_open_positions = cls.VALID_POSITIONS - rock_set
-        
-        # The map is fully accessible if we can reach all non-rock positions
-        return accessible == all_open_positions
+        # Flood from the lowest open cell and compare with the full open set
+        start = open_cells & -open_cells
+        return board.flood_fill(start, open_cells) == open_cells
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+def splitmix64(value: int) -> int:
+    """Mix an integer into a well-spread pseudo-random 64-bit key"""
+    z = (value + _GOLDEN_GAMMA) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
 
 class PathFinderCache:
-    """Optional cache wrapper for path finding results"""
-    def __init__(self, size: int = 1024):
+    """
+    LRU cache for accessibility results.
+    Entries are keyed by a Zobrist hash of the rock layout that is updated
+    in O(1) whenever a rock is added or removed, plus the tested position,
+    so lookups never have to hash the whole rock set.
+    """
+    def __init__(self, size: int = 1024, seed: int = 0):
         self.cache_size = size
-        self._cache = {}
-        self._cache_order = []
-
-    def _make_cache_key(self, rocks: Set[Tuple[int, int]], test_pos: Tuple[int, int] = None) -> Tuple:
-        """Create an immutable cache key from the parameters"""
-        return (frozenset(rocks), test_pos)
-
-    def get(self, rocks: Set[Tuple[int, int]], test_pos: Tuple[int, int] = None) -> bool:
-        """Get cached result if it exists"""
-        key = self._make_cache_key(rocks, test_pos)
-        return self._cache.get(key)
-
-    def set(self, rocks: Set[Tuple[int, int]], test_pos: Tuple[int, int], result: bool) -> None:
-        """Cache the result with LRU eviction"""
-        key = self._make_cache_key(rocks, test_pos)
-        
-        if key in self._cache:
-            # Move to most recent
-            self._cache_order.remove(key)
-            self._cache_order.append(key)
-            return
+        self._cache: "OrderedDict[Tuple[int, Optional[Tuple[int, int]]], bool]" = OrderedDict()
+        self._zobrist_seed = seed
+        self.rock_hash = 0
+
+        # Counters for sizing the cache
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _zobrist_key(self, pos: Tuple[int, int]) -> int:
+        """
+        Get the pseudo-random 64-bit key of a position.
+        Keys are a splitmix64 mix of the position and seed, so no per-cell
+        key table has to be kept around for large maps.
+        """
+        return splitmix64((((pos[0] & 0xFFFFFFFF) << 32 | (pos[1] & 0xFFFFFFFF))
+                           + self._zobrist_seed * _GOLDEN_GAMMA) & _MASK64)
+
+    def toggle_rock(self, pos: Tuple[int, int]) -> None:
+        """Update the layout hash for a rock added to or removed from pos"""
+        self.rock_hash ^= self._zobrist_key(pos)
 
-        if len(self._cache) >= self.cache_size:
-            # Evict oldest
-            old_key = self._cache_order.pop(0)
-            del self._cache[old_key]
+    def get(self, test_pos: Tuple[int, int] = None) -> Optional[bool]:
+        """Get the cached result for the current rock layout, if any"""
+        key = (self.rock_hash, test_pos)
+        result = self._cache.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+        return result
 
+    def set(self, test_pos: Tuple[int, int], result: bool) -> None:
+        """Cache the result for the current rock layout with LRU eviction"""
+        key = (self.rock_hash, test_pos)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+        elif len(self._cache) >= self.cache_size:
+            # Evict least recently used
+            self._cache.popitem(last=False)
+            self.evictions += 1
         self._cache[key] = result
-        self._cache_order.append(key)
\ No newline at end of file
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        """Drop every cached result and reset the counters"""
+        self._cache.clear()
+        self.hits = self.misses = self.evictions = 0
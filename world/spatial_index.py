@@ -0,0 +1,44 @@
+# world/spatial_index.py
+from typing import Dict, Iterator, Tuple
+from constants import SPATIAL_CHUNK_SIZE
+from entities.base_entity import BaseEntity
+
+class SpatialIndex:
+    """
+    Buckets entities into square chunks of cells.
+    Rectangle queries only visit the chunks that overlap the rectangle,
+    so their cost follows the queried area instead of the entity count.
+    """
+    def __init__(self, chunk_size: int = SPATIAL_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._chunks: Dict[Tuple[int, int], Dict[Tuple[int, int], BaseEntity]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(chunk) for chunk in self._chunks.values())
+
+    def _chunk_of(self, position: Tuple[int, int]) -> Tuple[int, int]:
+        return (position[0] // self.chunk_size, position[1] // self.chunk_size)
+
+    def add(self, entity: BaseEntity) -> None:
+        """Add an entity at its current position"""
+        position = entity.position
+        self._chunks.setdefault(self._chunk_of(position), {})[position] = entity
+
+    def remove(self, position: Tuple[int, int]) -> None:
+        """Remove whatever entity is indexed at a position"""
+        chunk_pos = self._chunk_of(position)
+        chunk = self._chunks.get(chunk_pos)
+        if chunk is not None and chunk.pop(position, None) is not None and not chunk:
+            del self._chunks[chunk_pos]
+
+    def query(self, min_x: int, min_y: int, max_x: int, max_y: int) -> Iterator[BaseEntity]:
+        """Iterate over entities inside the inclusive cell rectangle"""
+        size = self.chunk_size
+        for chunk_y in range(min_y // size, max_y // size + 1):
+            for chunk_x in range(min_x // size, max_x // size + 1):
+                chunk = self._chunks.get((chunk_x, chunk_y))
+                if not chunk:
+                    continue
+                for (x, y), entity in chunk.items():
+                    if min_x <= x <= max_x and min_y <= y <= max_y:
+                        yield entity
@@ -0,0 +1,88 @@
+# world/update_scheduler.py
+import heapq
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+from entities.base_entity import BaseEntity
+
+class UpdateScheduler:
+    """
+    Ticks only the entities that have behavior.
+    Each scheduled entity has its own update interval and sits in a heap
+    keyed by when it is next due, so a tick costs time proportional to the
+    entities it actually updates rather than to everything on the map.
+    Sleeping entities stay registered but are left out of the heap until
+    something wakes them.
+    """
+    def __init__(self):
+        self.time = 0.0
+        self._heap: List[Tuple[float, int, BaseEntity]] = []
+        self._intervals: Dict[BaseEntity, float] = {}
+        self._last_update: Dict[BaseEntity, float] = {}
+        # Sequence number of each awake entity's live heap entry; older
+        # entries for the same entity are skipped when popped
+        self._awake: Dict[BaseEntity, int] = {}
+        self._sequence = count()
+
+    def __len__(self) -> int:
+        """Number of awake entities"""
+        return len(self._awake)
+
+    def __contains__(self, entity: BaseEntity) -> bool:
+        return entity in self._intervals
+
+    def _push(self, entity: BaseEntity, due: float) -> None:
+        sequence = next(self._sequence)
+        self._awake[entity] = sequence
+        heapq.heappush(self._heap, (due, sequence, entity))
+        # Drop stale entries once they outnumber the live ones
+        if len(self._heap) > 2 * len(self._awake) + 64:
+            self._heap = [entry for entry in self._heap if self._awake.get(entry[2]) == entry[1]]
+            heapq.heapify(self._heap)
+
+    def schedule(self, entity: BaseEntity, interval: Optional[float] = None, delay: float = 0.0) -> None:
+        """Register an entity to be updated every interval seconds (its update_interval by default)"""
+        if interval is None:
+            interval = entity.update_interval
+        self._intervals[entity] = interval
+        self._last_update[entity] = self.time
+        self._push(entity, self.time + delay)
+
+    def unschedule(self, entity: BaseEntity) -> None:
+        """Stop updating an entity, e.g. when it leaves the world"""
+        if self._intervals.pop(entity, None) is not None:
+            del self._last_update[entity]
+            self._awake.pop(entity, None)
+
+    def sleep(self, entity: BaseEntity) -> None:
+        """Pause a scheduled entity until wake() is called"""
+        self._awake.pop(entity, None)
+
+    def wake(self, entity: BaseEntity, delay: float = 0.0) -> None:
+        """Resume a sleeping entity, or bring its next update forward to delay seconds from now"""
+        if entity not in self._intervals:
+            return
+        if entity not in self._awake:
+            # Time spent asleep doesn't count towards the next update's dt
+            self._last_update[entity] = self.time
+        self._push(entity, self.time + delay)
+
+    def update(self, dt: float) -> None:
+        """Advance the clock and update every entity that is due, passing the time since its last update"""
+        self.time += dt
+        now = self.time
+        heap = self._heap
+        due = []
+        while heap and heap[0][0] <= now:
+            _, sequence, entity = heapq.heappop(heap)
+            if self._awake.get(entity) == sequence:
+                due.append((sequence, entity))
+
+        for sequence, entity in due:
+            # An earlier update this tick may have put it to sleep or removed it
+            if self._awake.get(entity) != sequence:
+                continue
+            elapsed = now - self._last_update[entity]
+            self._last_update[entity] = now
+            entity.update(elapsed)
+            if self._awake.get(entity) == sequence:
+                self._push(entity, now + self._intervals[entity])